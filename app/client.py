@@ -0,0 +1,107 @@
+# app/client.py
+import json
+from urllib.error import HTTPError
+from urllib.parse import quote, urlencode
+from urllib.request import Request, urlopen
+
+from app.service import AuthError, NotFound, ServiceError
+
+_ERRORS = {401: AuthError, 404: NotFound}
+
+
+# ======================================================
+# REMOTE ORDER SERVICE
+# ======================================================
+class RemoteService:
+    """OrderService look-alike that talks to app/server.py over HTTP.
+
+    Method names, arguments and return values match OrderService, so the CLI can
+    use either one.
+    """
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _call(self, method, path, token=None, body=None, **query):
+        query = {k: v for k, v in query.items() if v is not None}
+        url = self.base_url + path + (f"?{urlencode(query)}" if query else "")
+        data = json.dumps(body).encode() if body is not None else None
+        request = Request(url, data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+        if token:
+            request.add_header("Authorization", f"Bearer {token}")
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", e.reason)
+            except ValueError:
+                message = e.reason
+            raise _ERRORS.get(e.code, ServiceError)(message)
+
+    # -----------------------
+    # Login / Sessions
+    # -----------------------
+    def lookup(self, email):
+        return self._call("GET", "/users", email=email)
+
+    def login(self, email, password):
+        return self._call("POST", "/login", body={"email": email, "password": password})
+
+    def register(self, email, password, name):
+        return self._call("POST", "/register", body={"email": email, "password": password, "name": name})
+
+    def logout(self, token):
+        return self._call("POST", "/logout", token)
+
+    # -----------------------
+    # Browse
+    # -----------------------
+    def restaurants(self, after=None, limit=None):
+        return self._call("GET", "/restaurants", after=after, limit=limit)
+
+    def menu(self, restaurant):
+        return self._call("GET", f"/restaurants/{quote(restaurant, safe='')}/menu")
+
+    def search(self, query, limit=20):
+        return self._call("GET", "/search", q=query, limit=limit)
+
+    # -----------------------
+    # Cart / Checkout
+    # -----------------------
+    def cart(self, token):
+        return self._call("GET", "/cart", token)
+
+    def add_to_cart(self, token, restaurant, dish, qty):
+        return self._call("POST", "/cart", token, {"restaurant": restaurant, "dish": dish, "qty": qty})
+
+    def clear_cart(self, token):
+        return self._call("DELETE", "/cart", token)
+
+    def checkout(self, token, payment="cash", card=None, save_card=False):
+        return self._call("POST", "/checkout", token, {"payment": payment, "card": card, "save_card": save_card})
+
+    # -----------------------
+    # History / Account
+    # -----------------------
+    def orders(self, token, before_order_id=None, limit=None):
+        return self._call("GET", "/orders", token, before=before_order_id, limit=limit)
+
+    def stats(self, token, limit=5):
+        return self._call("GET", "/stats", token, limit=limit)
+
+    def saved_card(self, token):
+        return self._call("GET", "/account/card", token)
+
+    def account(self, token):
+        return self._call("GET", "/account", token)
+
+    def change_password(self, token, old_password, new_password):
+        return self._call(
+            "POST", "/account/password", token, {"old_password": old_password, "new_password": new_password}
+        )
+
+    def add_payment(self, token, card, cvv, expiry):
+        return self._call("POST", "/account/card", token, {"card": card, "cvv": cvv, "expiry": expiry})
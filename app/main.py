@@ -1,28 +1,13 @@
 # app/main.py
+import argparse
+import atexit
 import os
 import time
-import random
-import humanize
-from datetime import datetime, timedelta
+from datetime import datetime
 from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.prompt import Prompt
-import pwinput
-
-# Import DB functions
-from db.sql import (
-    register,
-    login,
-    check_user,
-    change_password,
-    get_restaurants,
-    place_order,
-    add_payment,
-    retrieve_payment,
-    view_orders,
-    retrieve_user,
-)
+
+from app.service import OrderService, ServiceError
+from db.metrics import metrics
 
 # -----------------------
 # Utility Setup
@@ -30,6 +15,16 @@ from db.sql import (
 console = Console()
 project_name = "Yippee"
 clear = lambda: os.system("cls" if os.name == "nt" else "clear")
+# multiplier for the short pauses after status messages; 0 (default) skips them
+DELAY = float(os.getenv("YIPPEE_DELAY", "0"))
+
+# the order service this CLI is a client of (in-process by default, or remote with --server)
+service = OrderService()
+# the logged-in session: {"token", "email", "name"}
+session = None
+# fixed page sizes for the restaurant list and order history
+RESTAURANTS_PER_PAGE = 15
+ORDERS_PER_PAGE = 5
 
 # -----------------------
 # Helper Functions
@@ -42,11 +37,26 @@ def input_prompt(prompt=""):
     return console.input(prompt)
 
 
+def password_prompt(prompt=""):
+    import pwinput
+
+    return pwinput.pwinput(prompt=prompt)
+
+
+def pause(seconds):
+    if DELAY > 0:
+        time.sleep(seconds * DELAY)
+
+
 def prompt_choice(prompt, choices=None, default=None):
+    from rich.prompt import Prompt
+
     return Prompt.ask(prompt, choices=choices, default=default)
 
 
 def print_table(title, headers, rows):
+    from rich.table import Table
+
     table = Table(title=title)
     for h in headers:
         table.add_column(h, overflow="fold")
@@ -55,7 +65,54 @@ def print_table(title, headers, rows):
     console.print(table)
 
 
+def keyset_pages(fetch, key, page_size):
+    """Generator over the pages of a keyset-paginated query, steered with send().
+
+    `fetch(cursor, limit)` returns the rows after `cursor` (None for the first page) and
+    `key(row)` gives the cursor that follows a row. Each step yields
+    (page number, rows, has_next); send "next" or "prev" to move, anything else stays.
+    Only one page is held at a time, plus the start cursor of each page visited.
+    """
+    starts = [None]
+    while True:
+        rows = fetch(starts[-1], page_size + 1)  # one extra row tells whether a next page exists
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        move = yield len(starts), rows, has_next
+        if move == "next" and has_next:
+            starts.append(key(rows[-1]))
+        elif move == "prev" and len(starts) > 1:
+            starts.pop()
+
+
+def browse(fetch, key, page_size, render, prompt):
+    """Show a paged list with (n)ext / (p)revious navigation; returns the first other input."""
+    pages = keyset_pages(fetch, key, page_size)
+    page = next(pages)
+    while True:
+        number, rows, has_next = page
+        clear()
+        render(rows)
+        nav = [f"Page {number}"]
+        if number > 1:
+            nav.append("(p) previous")
+        if has_next:
+            nav.append("(n) next")
+        cprint(" | ".join(nav))
+
+        choice = input_prompt(prompt).strip()
+        if choice.lower() == "n" and has_next:
+            page = pages.send("next")
+        elif choice.lower() == "p" and number > 1:
+            page = pages.send("prev")
+        else:
+            pages.close()
+            return choice
+
+
 def print_panel(title, content):
+    from rich.panel import Panel
+
     console.print(Panel(content, title=title, expand=False))
 
 
@@ -63,46 +120,45 @@ def print_panel(title, content):
 # LOGIN SCREEN
 # ======================================================
 def loginscreen():
-    global loginDetails, user_name
+    global session
 
     clear()
     cprint(f"[bold cyan]Welcome to {project_name}![/bold cyan]")
     cprint("Delicious food from Kochi’s best restaurants.\n")
 
     email = input_prompt("Enter your email address: ")
-    exists, name = check_user(email)
+    user = service.lookup(email)
 
-    if exists:
+    if user["exists"]:
         # Existing user
         while True:
-            password = pwinput.pwinput(prompt=f"Welcome back {name}!\nEnter your password: ")
-            if login(email, password):
-                cprint("[green]Login successful![/green]")
-                loginDetails = email
-                user_name = name
-                time.sleep(1)
-                break
-            else:
+            password = password_prompt("Welcome back!\nEnter your password: ")
+            try:
+                session = service.login(email, password)
+            except ServiceError:
                 cprint("[red]Incorrect password, please try again.[/red]")
+                continue
+            cprint("[green]Login successful![/green]")
+            pause(1)
+            break
     else:
         # New user
         cprint("\n[bold yellow]New user detected![/bold yellow]")
         name = input_prompt("Enter your name: ")
-        password = pwinput.pwinput(prompt="Enter a secure password: ")
-        register(email, password, name)
+        password = password_prompt("Enter a secure password: ")
+        session = service.register(email, password, name)
         cprint("[green]Registration and auto-login successful![/green]")
-        loginDetails = email
-        user_name = name
-        time.sleep(1)
+        pause(1)
 
     clear()
-    cprint(f"[cyan]Welcome, {user_name}![/cyan]")
+    cprint(f"[cyan]Welcome, {session['name']}![/cyan]")
 
 
 # ======================================================
 # PAYMENT HANDLING
 # ======================================================
-def handle_payment(cart, delivery_time, total_price):
+def handle_payment():
+    """Ask for new card details; returns (card, save_card) for service.checkout."""
     cprint("\n[bold cyan]Payment Section[/bold cyan]")
     save = prompt_choice("Save card for future? (1.Yes / 2.No)", choices=["1", "2"], default="1")
 
@@ -124,27 +180,140 @@ def handle_payment(cart, delivery_time, total_price):
             break
         cprint("[red]Invalid expiry format. Try again.[/red]")
 
-    cardtype = "Visa" if card.startswith("4") else "MasterCard"
-    if save == "1":
-        add_payment(loginDetails, card, cvv, expiry, cardtype)
+    return {"card": card, "cvv": cvv, "expiry": expiry}, save == "1"
+
+
+# ======================================================
+# ORDERING
+# ======================================================
+def order_screen(restaurant):
+    """Menu, cart and checkout for one restaurant."""
+    try:
+        info = service.menu(restaurant)
+    except ServiceError as e:
+        cprint(f"[red]{e}[/red]")
+        input_prompt("Press Enter to continue...")
+        return
+    name, menu = info["name"], info["menu"]
+    # case-insensitive dish lookup
+    dishes = {dish.lower(): dish for dish in menu}
+    token = session["token"]
+    service.clear_cart(token)
+
+    while True:
+        clear()
+        menu_rows = [(dish, f"{price} INR") for dish, price in menu.items()]
+        print_table(f"Menu - {name}", ["Dish", "Price"], menu_rows)
+
+        choice = input_prompt('Enter dish to add (or "checkout" to proceed): ')
+        if choice.lower() == "checkout":
+            cart = service.cart(token)
+            if not cart["items"]:
+                cprint("[red]Cart is empty.[/red]")
+                input_prompt("Press Enter to continue...")
+                return
+
+            cprint("\nYour Cart Summary:")
+            cart_rows = [(dish, qty, f"{price} INR") for dish, qty, price in cart["items"]]
+            print_table("Cart", ["Dish", "Qty", "Price"], cart_rows)
+            cprint(f"Total = {cart['total_price']} INR\n")
+
+            payment_method = prompt_choice(
+                "Payment Method (1.Cash / 2.Card):", choices=["1", "2"], default="1"
+            )
+
+            payment, card, save_card = "cash", None, False
+            if payment_method == "2":
+                saved = service.saved_card(token)
+                use_saved = "2"
+                if saved:
+                    use_saved = prompt_choice(
+                        f"Use saved {saved['cardtype']} ending {saved['last4']}? (1.Yes / 2.No)",
+                        choices=["1", "2"],
+                        default="1",
+                    )
+                if use_saved == "1":
+                    payment = "saved"
+                else:
+                    payment = "card"
+                    card, save_card = handle_payment()
+
+            try:
+                order = service.checkout(token, payment, card, save_card)
+            except ServiceError as e:
+                cprint(f"[red]{e}[/red]")
+                input_prompt("Press Enter to continue...")
+                return
+
+            if payment == "cash":
+                cprint("\n[green]Order placed successfully! Pay on delivery.[/green]")
+            elif payment == "saved":
+                cprint(f"Paid using saved {order['paid_with']}")
+            else:
+                cprint(f"\nPayment successful using {order['paid_with']}")
+                cprint(f"Order placed for {len(order['items'])} items. Total = {order['total_price']} INR")
+            cprint(f"Estimated delivery: {order['delivery_minutes']} minutes")
+            input_prompt("\nPress Enter to continue...")
+            return
+
+        elif choice.strip().lower() in dishes:
+            dish = dishes[choice.strip().lower()]
+            try:
+                qty = int(input_prompt("Enter quantity: "))
+                cart = service.add_to_cart(token, name, dish, qty)
+                cprint(f"Added {dish} x{qty} (cart total {cart['total_price']} INR)")
+                input_prompt("Press Enter to continue...")
+            except (ValueError, ServiceError):
+                cprint("[red]Invalid quantity.[/red]")
+                input_prompt("Press Enter to continue...")
+        else:
+            cprint("[red]Invalid dish name.[/red]")
+            input_prompt("Press Enter to continue...")
+
+
+def search_screen():
+    """Search dishes across every restaurant, then optionally order from one."""
+    clear()
+    query = input_prompt('Search dishes (e.g. "biryani" or "pizza under 400"): ')
+    hits = service.search(query)
+    if not hits:
+        cprint("[red]No matching dishes found.[/red]")
+        input_prompt("Press Enter to continue...")
+        return
 
-    cprint(f"\nPayment successful using {cardtype} ending with {card[-4:]}")
-    cprint(f"Order placed for {len(cart)} items. Total = {total_price} INR")
-    cprint(f"Estimated delivery: {delivery_time // 60} minutes")
+    rows = [(h["dish"], h["restaurant"], f"{h['price']} INR", h["rating"]) for h in hits]
+    print_table(f"Results for '{query}'", ["Dish", "Restaurant", "Price", "Rating"], rows)
+    selected = input_prompt("\nEnter restaurant name to order from (or press Enter to go back): ")
+    if selected.strip():
+        order_screen(selected)
 
 
 # ======================================================
 # MAIN PROGRAM LOOP
 # ======================================================
+def stats_screen():
+    """The customer's totals and the most popular restaurants and dishes."""
+    clear()
+    stats = service.stats(session["token"])
+    print_panel("Your Stats", f"Orders placed: {stats['order_count']}\nTotal spent: {stats['total_spent']} INR")
+    rows = [(r["restaurant"], r["order_count"]) for r in stats["top_restaurants"]]
+    print_table("Top Restaurants", ["Restaurant", "Orders"], rows)
+    rows = [(d["dish"], d["restaurant"], d["quantity"]) for d in stats["top_dishes"]]
+    print_table("Top Dishes", ["Dish", "Restaurant", "Sold"], rows)
+    input_prompt("\nPress Enter to go back: ")
+
+
 def main_menu():
     while True:
         clear()
-        cprint(f"[bold magenta]Welcome to {project_name}, {user_name}![/bold magenta]")
+        cprint(f"[bold magenta]Welcome to {project_name}, {session['name']}![/bold magenta]")
         cprint("1. Place an Order")
-        cprint("2. View Previous Orders")
-        cprint("3. Account Settings")
-        cprint("4. Logout")
-        cprint("5. Exit")
+        cprint("2. Search Dishes")
+        cprint("3. View Previous Orders")
+        cprint("4. Your Stats")
+        cprint("5. Account Settings")
+        cprint("6. Logout")
+        cprint("7. Exit")
 
         choice = input_prompt("\nEnter your choice: ")
 
@@ -154,160 +323,157 @@ def main_menu():
         if choice == "1":
             clear()
             cprint("[bold cyan]Fetching nearby restaurants...[/bold cyan]")
-            restaurants = get_restaurants()
-            time.sleep(1)
-            clear()
-
-            rows = []
-            for r in restaurants:
-                details = eval(r[2])
-                rows.append((r[0], details["Location"], details["Cuisine"], details["Rating"]))
-            print_table("Available Restaurants", ["Name", "Location", "Cuisine", "Rating"], rows)
-
-            selected = input_prompt("\nEnter restaurant name: ")
-            found = False
-
-            for r in restaurants:
-                if r[0].lower() == selected.lower():
-                    found = True
-                    menu = eval(r[1])
-                    cart = []
-                    while True:
-                        clear()
-                        menu_rows = [(dish, f"{price} INR") for dish, price in menu.items()]
-                        print_table(f"Menu - {r[0]}", ["Dish", "Price"], menu_rows)
-
-                        choice = input_prompt('Enter dish to add (or "checkout" to proceed): ')
-                        if choice.lower() == "checkout":
-                            if not cart:
-                                cprint("[red]Cart is empty.[/red]")
-                                input_prompt("Press Enter to continue...")
-                                break
-
-                            total_price = sum([item[2] for item in cart])
-                            delivery_time = random.randint(20, 50) * 60
-                            unix = (datetime.now() + timedelta(seconds=delivery_time)).timestamp()
-
-                            cprint("\nYour Cart Summary:")
-                            cart_rows = [(dish, qty, f"{price} INR") for dish, qty, price in cart]
-                            print_table("Cart", ["Dish", "Qty", "Price"], cart_rows)
-                            cprint(f"Total = {total_price} INR\n")
-
-                            payment_method = prompt_choice(
-                                "Payment Method (1.Cash / 2.Card):", choices=["1", "2"], default="1"
-                            )
-
-                            if payment_method == "1":
-                                cprint("\n[green]Order placed successfully! Pay on delivery.[/green]")
-                            else:
-                                saved, details = retrieve_payment(loginDetails)
-                                if saved:
-                                    use_saved = prompt_choice(
-                                        f"Use saved {details['cardtype']} ending {details['card'][-4:]}? (1.Yes / 2.No)",
-                                        choices=["1", "2"],
-                                        default="1",
-                                    )
-                                    if use_saved == "1":
-                                        cprint(f"Paid using saved {details['cardtype']} ending {details['card'][-4:]}")
-                                    else:
-                                        handle_payment(cart, delivery_time, total_price)
-                                else:
-                                    handle_payment(cart, delivery_time, total_price)
-
-                            place_order(loginDetails, r[0], cart, unix, total_price)
-                            input_prompt("\nPress Enter to continue...")
-                            break
-
-                        elif choice in menu:
-                            try:
-                                qty = int(input_prompt("Enter quantity: "))
-                                price = qty * menu[choice]
-                                cart.append((choice, qty, price))
-                                cprint(f"Added {choice} x{qty} ({price} INR)")
-                                input_prompt("Press Enter to continue...")
-                            except Exception:
-                                cprint("[red]Invalid quantity.[/red]")
-                                input_prompt("Press Enter to continue...")
-                        else:
-                            cprint("[red]Invalid dish name.[/red]")
-                            input_prompt("Press Enter to continue...")
-            if not found:
-                cprint("[red]Restaurant not found![/red]")
-                input_prompt("Press Enter to continue...")
+            pause(1)
+
+            def show_restaurants(restaurants):
+                rows = [(r["name"], r["Location"], r["Cuisine"], r["Rating"]) for r in restaurants]
+                print_table("Available Restaurants", ["Name", "Location", "Cuisine", "Rating"], rows)
+
+            selected = browse(
+                lambda after, limit: service.restaurants(after, limit),
+                lambda r: r["name"],
+                RESTAURANTS_PER_PAGE,
+                show_restaurants,
+                "\nEnter restaurant name (or press Enter to go back): ",
+            )
+            if selected:
+                order_screen(selected)
 
         # --------------------------
-        # VIEW ORDERS
+        # SEARCH DISHES
         # --------------------------
         elif choice == "2":
-            clear()
-            success, orders = view_orders(loginDetails)
-            if not success:
-                cprint("[red]No orders yet.[/red]")
-                input_prompt("Press Enter to continue...")
-                continue
+            search_screen()
 
-            for order in orders:
-                cprint(f"\n[bold cyan]Order #{order['order_id']}[/bold cyan]")
-                cprint(f"Restaurant: {order['restaurant']}")
-                cprint(f"Total: {order['total_price']} INR")
-                delivery_status = "Delivered" if order["unix_time"] < datetime.now().timestamp() else "Delivering in"
-                cprint(f"Status: {delivery_status} {humanize.naturaltime(datetime.fromtimestamp(order['unix_time']))}")
-                cprint("Items:")
-                for dish, qty, price in order["items"]:
-                    cprint(f"  • {dish} x{qty} = {price} INR")
+        # --------------------------
+        # VIEW ORDERS
+        # --------------------------
+        elif choice == "3":
+            from humanize import naturaltime
+
+            def show_orders(orders):
+                if not orders:
+                    cprint("[red]No orders yet.[/red]")
+                for order in orders:
+                    cprint(f"\n[bold cyan]Order #{order['order_id']}[/bold cyan]")
+                    cprint(f"Restaurant: {order['restaurant']}")
+                    cprint(f"Total: {order['total_price']} INR")
+                    delivered = order["unix_time"] < datetime.now().timestamp()
+                    delivery_status = "Delivered" if delivered else "Delivering in"
+                    cprint(f"Status: {delivery_status} {naturaltime(datetime.fromtimestamp(order['unix_time']))}")
+                    cprint("Items:")
+                    for dish, qty, price in order["items"]:
+                        cprint(f"  • {dish} x{qty} = {price} INR")
+                cprint("")
+
+            browse(
+                lambda before, limit: service.orders(session["token"], before, limit),
+                lambda order: order["order_id"],
+                ORDERS_PER_PAGE,
+                show_orders,
+                "\nPress Enter to go back: ",
+            )
 
-            input_prompt("\nPress Enter to continue...")
+        # --------------------------
+        # STATS
+        # --------------------------
+        elif choice == "4":
+            stats_screen()
 
         # --------------------------
         # ACCOUNT SETTINGS
         # --------------------------
-        elif choice == "3":
+        elif choice == "5":
             clear()
-            user = retrieve_user(loginDetails)
-            saved, card = retrieve_payment(loginDetails)
-            card_info = f"{card['cardtype']} ending {card['card'][-4:]}" if saved else "None"
-            content = f"Name: {user[2]}\nEmail: {user[0]}\nSaved Card: {card_info}"
+            account = service.account(session["token"])
+            card = account["card"]
+            card_info = f"{card['cardtype']} ending {card['last4']}" if card else "None"
+            content = f"Name: {account['name']}\nEmail: {account['email']}\nSaved Card: {card_info}"
             print_panel("Account Details", content)
 
             ch = prompt_choice("Change password? (1.Yes / 2.No)", choices=["1", "2"], default="2")
             if ch == "1":
-                old_pw = pwinput.pwinput("Enter old password: ")
-                if login(loginDetails, old_pw):
-                    new_pw = pwinput.pwinput("Enter new password: ")
-                    confirm = pwinput.pwinput("Confirm new password: ")
-                    if new_pw == confirm:
-                        change_password(loginDetails, new_pw)
-                        cprint("[green]Password updated successfully![/green]")
-                    else:
-                        cprint("[red]Passwords do not match![/red]")
+                old_pw = password_prompt("Enter old password: ")
+                new_pw = password_prompt("Enter new password: ")
+                confirm = password_prompt("Confirm new password: ")
+                if new_pw != confirm:
+                    cprint("[red]Passwords do not match![/red]")
                 else:
-                    cprint("[red]Incorrect old password![/red]")
+                    try:
+                        service.change_password(session["token"], old_pw, new_pw)
+                        cprint("[green]Password updated successfully![/green]")
+                    except ServiceError as e:
+                        cprint(f"[red]{e}[/red]")
                 input_prompt("Press Enter to continue...")
 
         # --------------------------
         # LOGOUT
         # --------------------------
-        elif choice == "4":
+        elif choice == "6":
             cprint("\n[cyan]Logging out...[/cyan]")
-            time.sleep(1.5)
+            service.logout(session["token"])
+            pause(1.5)
             loginscreen()
 
         # --------------------------
         # EXIT
         # --------------------------
-        elif choice == "5":
+        elif choice == "7":
             cprint(f"\n[bold green]Thank you for using {project_name}![/bold green]")
-            time.sleep(2)
+            pause(2)
             exit()
 
         else:
             cprint("[red]Invalid choice. Try again.[/red]")
-            time.sleep(1)
+            pause(1)
+
+
+# ======================================================
+# STATS
+# ======================================================
+def print_stats():
+    snapshot = metrics.snapshot()
+    for title, section in (("DB Functions", "functions"), ("SQL Statements", "statements")):
+        rows = [
+            (name, s["count"], s["errors"], s["rows"], s["mean_ms"], s["p95_ms"], s["max_ms"])
+            for name, s in sorted(snapshot[section].items(), key=lambda kv: -kv[1]["total_ms"])
+        ]
+        print_table(title, ["Name", "Calls", "Errors", "Rows", "Mean ms", "p95 ms", "Max ms"], rows)
+
+
+def dump_stats(path):
+    if path == "-":
+        print_stats()
+    else:
+        metrics.dump(path)
 
 
 # ======================================================
 # ENTRY POINT
 # ======================================================
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=f"{project_name} food ordering CLI")
+    parser.add_argument(
+        "--stats", nargs="?", const="-", metavar="PATH",
+        help="on exit, print db metrics (or write them as JSON to PATH)",
+    )
+    parser.add_argument(
+        "--stats-interval", type=float, metavar="SECONDS",
+        help="also write the --stats JSON snapshot every SECONDS while running",
+    )
+    parser.add_argument(
+        "--server", metavar="URL",
+        help="use a running order service (python -m app.server) instead of the local database",
+    )
+    args = parser.parse_args()
+    if args.server:
+        from app.client import RemoteService
+
+        service = RemoteService(args.server)
+    if args.stats:
+        atexit.register(dump_stats, args.stats)
+        if args.stats_interval and args.stats != "-":
+            metrics.dump_every(args.stats, args.stats_interval)
+
     loginscreen()
     main_menu()
@@ -0,0 +1,166 @@
+# app/server.py
+# Local HTTP JSON API over OrderService, serving many customers from one process:
+#     python -m app.server --host 127.0.0.1 --port 8080
+#
+# Log in with POST /login and send the returned token as "Authorization: Bearer <token>".
+import argparse
+import json
+import logging
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from app.service import OrderService, ServiceError
+from db.archive import start_archiver
+
+service = OrderService()
+
+
+# ======================================================
+# ROUTES
+# ======================================================
+def _int(value):
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ServiceError(f"Expected a whole number, got {value!r}.")
+
+
+# (method, path) -> handler(token, body, query); "{}" in a path captures one segment
+ROUTES = {
+    ("GET", "/users"): lambda t, b, q: service.lookup(q.get("email", "")),
+    ("POST", "/login"): lambda t, b, q: service.login(b.get("email"), b.get("password")),
+    ("POST", "/register"): lambda t, b, q: service.register(b.get("email"), b.get("password"), b.get("name")),
+    ("POST", "/logout"): lambda t, b, q: service.logout(t),
+
+    ("GET", "/restaurants"): lambda t, b, q: service.restaurants(q.get("after"), _int(q.get("limit"))),
+    ("GET", "/restaurants/{}/menu"): lambda t, b, q, name: service.menu(name),
+    ("GET", "/search"): lambda t, b, q: service.search(q.get("q", ""), _int(q.get("limit")) or 20),
+
+    ("GET", "/cart"): lambda t, b, q: service.cart(t),
+    ("POST", "/cart"): lambda t, b, q: service.add_to_cart(t, b.get("restaurant"), b.get("dish"), b.get("qty")),
+    ("DELETE", "/cart"): lambda t, b, q: service.clear_cart(t),
+    ("POST", "/checkout"): lambda t, b, q: service.checkout(
+        t, b.get("payment", "cash"), b.get("card"), bool(b.get("save_card"))
+    ),
+
+    ("GET", "/orders"): lambda t, b, q: service.orders(t, _int(q.get("before")), _int(q.get("limit"))),
+    ("GET", "/stats"): lambda t, b, q: service.stats(t, _int(q.get("limit")) or 5),
+    ("GET", "/account"): lambda t, b, q: service.account(t),
+    ("GET", "/account/card"): lambda t, b, q: service.saved_card(t),
+    ("POST", "/account/card"): lambda t, b, q: service.add_payment(t, b.get("card"), b.get("cvv"), b.get("expiry")),
+    ("POST", "/account/password"): lambda t, b, q: service.change_password(
+        t, b.get("old_password"), b.get("new_password")
+    ),
+}
+
+
+def _route(method, path):
+    """Find the handler for a request path and the path segments it captured."""
+    parts = [unquote(p) for p in path.strip("/").split("/")]
+    for (route_method, pattern), handler in ROUTES.items():
+        if route_method != method:
+            continue
+        pattern_parts = pattern.strip("/").split("/")
+        if len(pattern_parts) != len(parts):
+            continue
+        captured = []
+        for expected, actual in zip(pattern_parts, parts):
+            if expected == "{}":
+                captured.append(actual)
+            elif expected != actual:
+                break
+        else:
+            return handler, captured
+    return None, None
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# ======================================================
+# HTTP HANDLER
+# ======================================================
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self.close_connection = True  # the body cannot be skipped without its length
+            self._reply(400, {"error": "Invalid Content-Length."})
+            return
+        # read the body even when it goes unused, or the connection's next request would start inside it
+        raw = self.rfile.read(length) if length > 0 else b""
+
+        handler, captured = _route(method, url.path)
+        if handler is None:
+            self._reply(404, {"error": "Not found."})
+            return
+
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        try:
+            body = json.loads(raw) if raw else {}
+            if not isinstance(body, dict):
+                raise ServiceError("Request body must be a JSON object.")
+            self._reply(200, handler(token, body, query, *captured))
+        except ServiceError as e:
+            self._reply(e.status, {"error": str(e)})
+        except ValueError:  # json.JSONDecodeError, or undecodable bytes
+            self._reply(400, {"error": "Request body must be JSON."})
+        except Exception:
+            self.log_error("unhandled error on %s %s", method, url.path)
+            self._reply(500, {"error": "Internal server error."})
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload, default=_json_default).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+# ======================================================
+# ENTRY POINT
+# ======================================================
+def serve(host="127.0.0.1", port=8080):
+    # background work (order queue writer, archiver, slow queries) reports through logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    archiver = start_archiver()
+    print(f"Serving on http://{host}:{port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if archiver is not None:
+            archiver.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yippee order service (HTTP JSON API)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    serve(args.host, args.port)
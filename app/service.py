@@ -0,0 +1,294 @@
+# app/service.py
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+
+from db import sql
+from db.catalog import DETAIL_COLUMNS, catalog
+from db.eta import get_eta_engine
+from db.orderqueue import OrderQueueFull, get_order_queue
+from db.pricing import PricingError, price_cart
+from db.search import get_index
+
+
+class ServiceError(Exception):
+    """A request the service refuses; `status` is the matching HTTP status code."""
+
+    status = 400
+
+
+class AuthError(ServiceError):
+    status = 401
+
+
+class NotFound(ServiceError):
+    status = 404
+
+
+# ======================================================
+# SESSIONS
+# ======================================================
+class Session:
+    """One logged-in customer: who they are and what is in their cart."""
+
+    def __init__(self, username, name):
+        self.token = secrets.token_urlsafe(24)
+        self.username = username
+        self.name = name
+        self.restaurant = None
+        self.cart = []  # [(dish, qty)], one line per dish; priced by db.pricing
+        self.last_seen = time.monotonic()
+
+
+# ======================================================
+# ORDER SERVICE
+# ======================================================
+class OrderService:
+    """Everything a customer can do, keyed by session token instead of process globals.
+
+    One instance serves any number of concurrent customers against the shared db layer;
+    the Rich CLI uses it in-process and app/server.py exposes it over HTTP.
+    """
+
+    def __init__(self, session_ttl=1800):
+        self.session_ttl = session_ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    # -----------------------
+    # Login / Sessions
+    # -----------------------
+    def lookup(self, email):
+        """Whether an account exists. The name is only handed out after login."""
+        exists, _ = sql.check_user(email)
+        return {"exists": exists}
+
+    def login(self, email, password):
+        exists, name = sql.check_user(email)
+        if not exists or not sql.login(email, password):
+            raise AuthError("Incorrect email or password.")
+        return self._start_session(email, name)
+
+    def register(self, email, password, name):
+        if not email or not password:
+            raise ServiceError("Email and password are required.")
+        exists, _ = sql.check_user(email)
+        if exists:
+            raise ServiceError("An account with this email already exists.")
+        sql.register(email, password, name)
+        return self._start_session(email, name)
+
+    def logout(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+        sql.logout()
+        return {"ok": True}
+
+    def session(self, token):
+        """The live session for `token`; raises AuthError if it is unknown or expired."""
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None or now - session.last_seen > self.session_ttl:
+                self._sessions.pop(token, None)
+                raise AuthError("Not logged in (or the session expired).")
+            session.last_seen = now
+            return session
+
+    def _start_session(self, email, name):
+        session = Session(email, name)
+        now = time.monotonic()
+        with self._lock:
+            # drop expired sessions while we hold the lock anyway
+            for token in [t for t, s in self._sessions.items() if now - s.last_seen > self.session_ttl]:
+                del self._sessions[token]
+            self._sessions[session.token] = session
+        return {"token": session.token, "email": email, "name": name}
+
+    # -----------------------
+    # Browse
+    # -----------------------
+    def restaurants(self, after=None, limit=None):
+        """Restaurants by name; with `limit`, one keyset page starting after the name `after`."""
+        if limit is None:
+            return [{"name": r.name, **r.details} for r in catalog.all()]
+        return [
+            {"name": row[0], **dict(zip(DETAIL_COLUMNS, row[1:]))}
+            for row in sql.get_restaurants_page(after, limit)
+        ]
+
+    def menu(self, restaurant):
+        r = catalog.get(restaurant)
+        if r is None:
+            raise NotFound("Restaurant not found!")
+        return {"name": r.name, "details": r.details, "menu": r.menu}
+
+    def search(self, query, limit=20):
+        return [h._asdict() for h in get_index().search(query, limit)]
+
+    # -----------------------
+    # Cart
+    # -----------------------
+    def cart(self, token):
+        session = self.session(token)
+        return _cart_view(session)
+
+    def add_to_cart(self, token, restaurant, dish, qty):
+        session = self.session(token)
+        r = catalog.get(restaurant)
+        if r is None:
+            raise NotFound("Restaurant not found!")
+        # a cart only ever holds dishes from one restaurant
+        lines = session.cart if session.restaurant == r.name else []
+        priced = _price(r.name, lines + [(dish, qty)])
+        session.restaurant = r.name
+        session.cart = [(line.dish, line.quantity) for line in priced.lines]
+        return _cart_view(session, priced)
+
+    def clear_cart(self, token):
+        session = self.session(token)
+        session.restaurant, session.cart = None, []
+        return _cart_view(session)
+
+    # -----------------------
+    # Checkout
+    # -----------------------
+    def checkout(self, token, payment="cash", card=None, save_card=False):
+        """Place the cart as an order.
+
+        `payment` is "cash", "saved" (the saved card) or "card" (a new card given in `card`
+        as {"card", "cvv", "expiry"}; `save_card` stores it for next time).
+        """
+        session = self.session(token)
+        if not session.cart:
+            raise ServiceError("Cart is empty.")
+
+        paid_with = None
+        if payment == "saved":
+            card = sql.payment_summary(session.username)
+            if card is None:
+                raise ServiceError("No saved card.")
+            paid_with = f"{card['cardtype']} ending {card['last4']}"
+        elif payment == "card":
+            number, cvv, expiry = _validate_card(card)
+            cardtype = "Visa" if number.startswith("4") else "MasterCard"
+            if save_card:
+                sql.add_payment(session.username, number, cvv, expiry, cardtype)
+            paid_with = f"{cardtype} ending {number[-4:]}"
+        elif payment != "cash":
+            raise ServiceError("Payment must be cash, saved or card.")
+
+        priced = _price(session.restaurant, session.cart)
+        delivery_time = get_eta_engine().quote(priced.restaurant)
+        unix = (datetime.now() + timedelta(seconds=delivery_time)).timestamp()
+        queue = get_order_queue()
+        if queue is None:
+            try:
+                _, order_id = sql.place_order(session.username, session.restaurant, session.cart, unix)
+            except PricingError as e:
+                raise ServiceError(str(e))
+            order_ref = None
+        else:
+            # write-behind: the order is durable in the spool; its id is assigned when the batch commits
+            try:
+                pending = queue.submit(session.username, session.restaurant, session.cart, unix, timeout=5)
+            except PricingError as e:
+                raise ServiceError(str(e))
+            except OrderQueueFull:
+                raise ServiceError("We are taking too many orders right now, please try again.")
+            order_id, order_ref = None, pending.ref
+
+        order = {
+            "order_id": order_id,
+            "order_ref": order_ref,
+            "restaurant": priced.restaurant,
+            "items": [(line.dish, line.quantity, line.price) for line in priced.lines],
+            "total_price": priced.total,
+            "unix_time": unix,
+            "delivery_minutes": delivery_time // 60,
+            "paid_with": paid_with,
+        }
+        session.restaurant, session.cart = None, []
+        return order
+
+    # -----------------------
+    # History / Account
+    # -----------------------
+    def orders(self, token, before_order_id=None, limit=None):
+        session = self.session(token)
+        _, orders = sql.view_orders(session.username, before_order_id, limit)
+        return orders or []
+
+    def stats(self, token, limit=5):
+        """The customer's order count and spend, plus the most popular restaurants and dishes.
+
+        Everything comes from the summary tables of db/stats.py, never from the order history.
+        """
+        session = self.session(token)
+        return {
+            **sql.user_stats(session.username),
+            "top_restaurants": [
+                {"restaurant": r, "order_count": n, "revenue": revenue}
+                for r, n, revenue in sql.top_restaurants(limit)
+            ],
+            "top_dishes": [
+                {"restaurant": r, "dish": dish, "quantity": qty, "revenue": revenue}
+                for r, dish, qty, revenue in sql.top_dishes(None, limit)
+            ],
+        }
+
+    def saved_card(self, token):
+        """The saved card as {"cardtype", "last4"}, or None."""
+        session = self.session(token)
+        return sql.payment_summary(session.username)
+
+    def account(self, token):
+        session = self.session(token)
+        user = sql.retrieve_user(session.username)
+        return {"email": user[0], "name": user[2], "card": self.saved_card(token)}
+
+    def change_password(self, token, old_password, new_password):
+        session = self.session(token)
+        if not sql.login(session.username, old_password):
+            raise AuthError("Incorrect old password!")
+        sql.change_password(session.username, new_password)
+        return {"ok": True}
+
+    def add_payment(self, token, card, cvv, expiry):
+        session = self.session(token)
+        number, cvv, expiry = _validate_card({"card": card, "cvv": cvv, "expiry": expiry})
+        cardtype = "Visa" if number.startswith("4") else "MasterCard"
+        sql.add_payment(session.username, number, cvv, expiry, cardtype)
+        return {"cardtype": cardtype, "last4": number[-4:]}
+
+
+def _price(restaurant, items):
+    try:
+        return price_cart(restaurant, items)
+    except PricingError as e:
+        raise ServiceError(str(e))
+
+
+def _cart_view(session, priced=None):
+    """The cart with server-side line prices and total (from db.pricing)."""
+    if not session.cart:
+        return {"restaurant": session.restaurant, "items": [], "total_price": 0}
+    priced = priced or _price(session.restaurant, session.cart)
+    return {
+        "restaurant": priced.restaurant,
+        "items": [(line.dish, line.quantity, line.price) for line in priced.lines],
+        "total_price": priced.total,
+    }
+
+
+def _validate_card(card):
+    card = card or {}
+    number, cvv, expiry = str(card.get("card", "")), str(card.get("cvv", "")), str(card.get("expiry", ""))
+    if not (len(number) == 16 and number.isdigit()):
+        raise ServiceError("Invalid card number.")
+    if not (len(cvv) in (3, 4) and cvv.isdigit()):
+        raise ServiceError("Invalid CVV.")
+    if not ("/" in expiry and len(expiry) == 5):
+        raise ServiceError("Invalid expiry format.")
+    return number, cvv, expiry
@@ -0,0 +1,110 @@
+# db/aio.py
+# asyncio front end for db.sql:
+#     from db import aio
+#     ok = await aio.login(email, password)
+#     ok, orders = await aio.view_orders(email)
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from db import sql
+
+_UNSET = object()
+
+
+# ===================================================
+# EXECUTOR
+# ===================================================
+class AsyncDB:
+    """Runs blocking db.sql calls on a bounded worker pool for an event loop.
+
+    At most `max_concurrency` calls hit the database at once (default: the connection
+    pool size); everyone else waits on a semaphore, which costs a coroutine rather than
+    a thread, so one loop can hold thousands of idle or slow sessions. A call that times
+    out or is cancelled returns to its caller immediately, but its slot is only freed
+    once the worker thread finishes, so abandoned queries can never pile up beyond
+    the limit.
+    """
+
+    def __init__(self, max_concurrency=None, timeout=None):
+        if max_concurrency is None:
+            max_concurrency = sql.get_config().get("pool_size", 5)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="db-aio")
+        self._semaphore = None
+        self._loop = None
+
+    async def run(self, fn, *args, timeout=_UNSET, **kwargs):
+        """Await `fn(*args, **kwargs)` on a worker thread, giving up after `timeout` seconds."""
+        if timeout is _UNSET:
+            timeout = self.timeout
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # a Semaphore belongs to one loop; start fresh if we are used from another
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        semaphore = self._semaphore
+
+        await semaphore.acquire()
+        try:
+            future = loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            semaphore.release()
+            raise
+        future.add_done_callback(lambda _: semaphore.release())
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+    def close(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_default = None
+
+
+def configure(max_concurrency=None, timeout=None):
+    """Replace the shared executor used by the module-level functions."""
+    global _default
+    if _default is not None:
+        _default.close(wait=False)
+    _default = AsyncDB(max_concurrency, timeout)
+    return _default
+
+
+def _async(fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if _default is None:
+            configure(timeout=sql.get_config().get("async_timeout"))
+        return await _default.run(fn, *args, **kwargs)
+
+    return wrapper
+
+
+# ===================================================
+# ASYNC DB API
+# ===================================================
+register = _async(sql.register)
+login = _async(sql.login)
+check_user = _async(sql.check_user)
+change_password = _async(sql.change_password)
+retrieve_user = _async(sql.retrieve_user)
+
+get_restaurants = _async(sql.get_restaurants)
+get_restaurants_page = _async(sql.get_restaurants_page)
+get_menu = _async(sql.get_menu)
+get_menu_items = _async(sql.get_menu_items)
+set_dish_available = _async(sql.set_dish_available)
+set_dish_price = _async(sql.set_dish_price)
+
+add_payment = _async(sql.add_payment)
+retrieve_payment = _async(sql.retrieve_payment)
+payment_summary = _async(sql.payment_summary)
+
+place_order = _async(sql.place_order)
+view_orders = _async(sql.view_orders)
+active_orders = _async(sql.active_orders)
+
+user_stats = _async(sql.user_stats)
+top_restaurants = _async(sql.top_restaurants)
+top_dishes = _async(sql.top_dishes)
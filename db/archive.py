@@ -0,0 +1,100 @@
+# db/archive.py
+# Moves delivered orders out of the hot `orders` / `order_items` tables:
+#     python -m db.archive                   archive everything due, then exit
+#     python -m db.archive --every 600       keep archiving every 10 minutes
+# Settings (sqlDetails.json): archive_after_hours (24), archive_batch_size (1000),
+# archive_interval (seconds; app.server runs the archiver in the background when set).
+import argparse
+import logging
+import threading
+import time
+
+from db import sql
+
+log = logging.getLogger("yippee.archive")
+log.addHandler(logging.NullHandler())
+
+
+def archive_due(after_hours=24, batch_size=1000, pause=0.05, stop=None):
+    """Archive every order delivered more than `after_hours` ago, one batch per transaction.
+
+    Sleeps `pause` seconds between batches so live traffic keeps most of the database.
+    Returns the number of orders moved.
+    """
+    cutoff = time.time() - after_hours * 3600
+    moved = 0
+    while stop is None or not stop.is_set():
+        count = sql.archive_orders(cutoff, batch_size)
+        moved += count
+        if count < batch_size:
+            break
+        time.sleep(pause)
+    return moved
+
+
+# ===================================================
+# BACKGROUND ARCHIVER
+# ===================================================
+class Archiver:
+    """Daemon thread that runs archive_due every `interval` seconds."""
+
+    def __init__(self, interval=600, after_hours=24, batch_size=1000):
+        self.interval = interval
+        self.after_hours = after_hours
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="order-archiver", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                moved = archive_due(self.after_hours, self.batch_size, stop=self._stop)
+                if moved:
+                    log.info("Archived %d delivered orders.", moved)
+            except Exception as e:
+                log.warning("Order archiving failed (%s); retrying in %ss", e, self.interval)
+            self._stop.wait(self.interval)
+
+
+def start_archiver():
+    """Start a background Archiver if `archive_interval` is set in sqlDetails.json, else None."""
+    config = sql.get_config()
+    if not config.get("archive_interval"):
+        return None
+    return Archiver(
+        interval=config["archive_interval"],
+        after_hours=config.get("archive_after_hours", 24),
+        batch_size=config.get("archive_batch_size", 1000),
+    ).start()
+
+
+if __name__ == "__main__":
+    config = sql.get_config()
+    parser = argparse.ArgumentParser(description="Move delivered orders into the archive tables.")
+    parser.add_argument("--after-hours", type=float, default=config.get("archive_after_hours", 24),
+                        help="archive orders delivered more than this many hours ago")
+    parser.add_argument("--batch", type=int, default=config.get("archive_batch_size", 1000),
+                        help="orders moved per transaction")
+    parser.add_argument("--every", type=float, metavar="SECONDS", help="keep running, archiving at this interval")
+    args = parser.parse_args()
+
+    if args.every:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+        archiver = Archiver(args.every, args.after_hours, args.batch).start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            archiver.stop()
+    else:
+        start = time.monotonic()
+        moved = archive_due(args.after_hours, args.batch)
+        print(f"✅ Archived {moved} orders in {time.monotonic() - start:.1f}s.")
@@ -0,0 +1,377 @@
+# db/backends.py
+import json
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from decimal import Decimal
+
+from db.metrics import metrics
+
+
+def load_config(path="sqlDetails.json"):
+    """Read the database settings written by db/setup.py."""
+    with open(path) as f_json:
+        return json.load(f_json)
+
+
+def from_config(config):
+    """Build the storage backend selected by the `backend` key (default: mysql)."""
+    name = config.get("backend", "mysql")
+    if name == "mysql":
+        return MySQLBackend(config)
+    if name == "sqlite":
+        return SQLiteBackend(config)
+    raise ValueError(f"❌ Unknown backend {name!r} in sqlDetails.json (expected 'mysql' or 'sqlite').")
+
+
+# ===================================================
+# CURSOR
+# ===================================================
+class Cursor:
+    """Driver cursor that accepts the `%s` placeholder style on every backend.
+
+    Every statement is timed and counted in db.metrics, along with the rows fetched from it.
+    """
+
+    def __init__(self, backend, raw):
+        self.backend = backend
+        self.raw = raw
+        self.statement = None
+
+    def execute(self, statement, params=()):
+        self.statement = statement
+        self._timed(self.raw.execute, self.backend.sql(statement), tuple(params))
+
+    def executemany(self, statement, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        if seq_of_params:
+            self.statement = statement
+            self._timed(self.raw.executemany, self.backend.sql(statement), seq_of_params)
+
+    def fetchone(self):
+        row = self.raw.fetchone()
+        if row is not None:
+            metrics.record_rows(self.statement, 1)
+        return row
+
+    def fetchmany(self, size):
+        rows = self.raw.fetchmany(size)
+        metrics.record_rows(self.statement, len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self.raw.fetchall()
+        metrics.record_rows(self.statement, len(rows))
+        return rows
+
+    def _timed(self, call, statement, params):
+        start = time.perf_counter()
+        error = False
+        try:
+            call(statement, params)
+        except Exception:
+            error = True
+            raise
+        finally:
+            metrics.record_statement(self.statement, (time.perf_counter() - start) * 1000, error)
+
+    @property
+    def lastrowid(self):
+        return self.raw.lastrowid
+
+    @property
+    def rowcount(self):
+        return self.raw.rowcount
+
+    def close(self):
+        self.raw.close()
+
+
+class PreparedCursor(Cursor):
+    """Cursor that runs DML through server-side prepared statements cached per connection.
+
+    Each distinct statement is prepared the first time a connection sees it and the
+    handle is reused afterwards, so the server parses it once per connection. Results
+    are read in full right after execute, like the buffered cursor this replaces.
+    executemany and DDL keep using the plain cursor (MySQL turns an INSERT
+    executemany into one multi-row INSERT, which beats re-executing a statement).
+    """
+
+    def __init__(self, backend, conn):
+        super().__init__(backend, conn.cursor(buffered=True))
+        self.conn = conn
+        self._last = self.raw  # cursor that ran the latest statement
+        self._rows = None
+
+    def execute(self, statement, params=()):
+        if statement.lstrip()[:6].upper() not in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+            self._last, self._rows = self.raw, None
+            super().execute(statement, params)
+            return
+        self.statement = statement
+        self._timed(self._run_prepared, statement, tuple(params))
+
+    def _run_prepared(self, statement, params):
+        for attempt in (1, 2):
+            prepared, text = self.backend.prepared(self.conn, statement)
+            try:
+                prepared.execute(text, params)
+                break
+            except Exception as e:
+                # 1243: unknown statement handler (the server dropped it); prepare it again once
+                if attempt == 2 or getattr(e, "errno", None) != 1243:
+                    raise
+                self.backend.forget_prepared(self.conn)
+        self._last = prepared
+        self._rows = prepared.fetchall() if prepared.with_rows else None
+
+    def executemany(self, statement, seq_of_params):
+        self._last, self._rows = self.raw, None
+        super().executemany(statement, seq_of_params)
+
+    def fetchone(self):
+        if self._rows is None:
+            return super().fetchone()
+        if not self._rows:
+            return None
+        metrics.record_rows(self.statement, 1)
+        return self._rows.pop(0)
+
+    def fetchmany(self, size):
+        if self._rows is None:
+            return super().fetchmany(size)
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        metrics.record_rows(self.statement, len(rows))
+        return rows
+
+    def fetchall(self):
+        if self._rows is None:
+            return super().fetchall()
+        rows, self._rows = self._rows, []
+        metrics.record_rows(self.statement, len(rows))
+        return rows
+
+    @property
+    def lastrowid(self):
+        return self._last.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._last.rowcount
+
+
+# ===================================================
+# BACKENDS
+# ===================================================
+class Backend:
+    """Everything db/sql.py needs to know about a database engine."""
+
+    name = None
+    # column type for auto-incrementing integer primary keys
+    autoid = None
+
+    def __init__(self, config):
+        self.config = config
+
+    def connect(self):
+        raise NotImplementedError
+
+    def cursor(self, conn):
+        return Cursor(self, conn.cursor())
+
+    def streaming_cursor(self, conn):
+        """Cursor that leaves results on the server and fetches them as they are read."""
+        return Cursor(self, conn.cursor())
+
+    def begin(self, conn):
+        raise NotImplementedError
+
+    def ping(self, conn):
+        raise NotImplementedError
+
+    def is_connection_error(self, exc):
+        return False
+
+    def is_data_error(self, exc):
+        """Whether the database refused the statement's data, so running it again fails again."""
+        # DB-API exception names, shared by sqlite3 and mysql.connector
+        return any(cls.__name__ in ("IntegrityError", "DataError") for cls in type(exc).__mro__)
+
+    def sql(self, statement):
+        """Translate a `%s`-style statement to the driver's dialect."""
+        return statement
+
+    def upsert(self, table, columns, keys, add=()):
+        """INSERT statement that updates the non-key columns when a key already exists.
+
+        Columns in `add` are incremented by the new value instead of overwritten (counters).
+        """
+        raise NotImplementedError
+
+    def columns(self, cursor, table):
+        raise NotImplementedError
+
+    def indexes(self, cursor, table):
+        raise NotImplementedError
+
+
+class MySQLBackend(Backend):
+    """MySQL server backend.
+
+    With `prepared_statements` on (the default), every connection keeps an LRU cache of
+    up to `statement_cache_size` prepared statements, keyed by SQL text. The cache
+    belongs to the server session: when a ping reconnects the connection in place, the
+    new connection id empties it and statements are prepared again on next use.
+    """
+
+    name = "mysql"
+    autoid = "INT AUTO_INCREMENT PRIMARY KEY"
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.prepared_statements = config.get("prepared_statements", True)
+        self.statement_cache_size = config.get("statement_cache_size", 64)
+        self._statements = weakref.WeakKeyDictionary()  # conn -> (connection id, OrderedDict)
+        self._statements_lock = threading.Lock()
+
+    def connect(self, database="yippee"):
+        import mysql.connector as sql
+
+        conn = sql.connect(
+            host=self.config["host"],
+            user=self.config["username"],
+            password=self.config["password"],
+            database=database
+        )
+        conn.autocommit = True
+        return conn
+
+    def cursor(self, conn):
+        if self.prepared_statements:
+            return PreparedCursor(self, conn)
+        return Cursor(self, conn.cursor(buffered=True))
+
+    def streaming_cursor(self, conn):
+        return Cursor(self, conn.cursor(buffered=False))
+
+    def prepared(self, conn, statement):
+        """The cached prepared cursor for `statement` on `conn`, and the SQL text to execute.
+
+        mysql.connector re-prepares whenever it gets a different string object, so the
+        exact text object the statement was first prepared with is returned every time.
+        """
+        with self._statements_lock:
+            session_id, cache = self._statements.get(conn, (None, None))
+            if cache is None or session_id != conn.connection_id:
+                # new connection, or reconnected in place: old statement handles are gone
+                cache = OrderedDict()
+                self._statements[conn] = (conn.connection_id, cache)
+        entry = cache.get(statement)
+        if entry is not None:
+            cache.move_to_end(statement)
+            return entry
+        entry = cache[statement] = (conn.cursor(prepared=True), statement.replace("%s", "?"))
+        if len(cache) > self.statement_cache_size:
+            _, (evicted, _) = cache.popitem(last=False)
+            try:
+                evicted.close()  # deallocates the statement on the server
+            except Exception:
+                pass
+        return entry
+
+    def forget_prepared(self, conn):
+        """Drop every cached statement of `conn` so the next use prepares it again."""
+        with self._statements_lock:
+            self._statements.pop(conn, None)
+
+    def begin(self, conn):
+        conn.start_transaction()
+
+    def ping(self, conn):
+        conn.ping(reconnect=True, attempts=3, delay=1)
+
+    def is_connection_error(self, exc):
+        # 2006: server has gone away, 2013: lost connection, 2055: lost connection (SSL/IO)
+        return getattr(exc, "errno", None) in (2006, 2013, 2055)
+
+    def upsert(self, table, columns, keys, add=()):
+        updates = ", ".join(
+            f"{c}={c}+VALUES({c})" if c in add else f"{c}=VALUES({c})" for c in columns if c not in keys
+        )
+        return (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+            f"ON DUPLICATE KEY UPDATE {updates}"
+        )
+
+    def columns(self, cursor, table):
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_schema = DATABASE() AND table_name = %s",
+            (table,)
+        )
+        return {row[0].lower() for row in cursor.fetchall()}
+
+    def indexes(self, cursor, table):
+        cursor.execute(
+            "SELECT DISTINCT index_name FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = %s",
+            (table,)
+        )
+        return {row[0].lower() for row in cursor.fetchall()}
+
+
+# DECIMAL columns have NUMERIC affinity in SQLite, so prices bound as text are stored as numbers
+sqlite3.register_adapter(Decimal, str)
+
+
+class SQLiteBackend(Backend):
+    """Embedded single-file backend for single-node deployments, CI and benchmarks.
+
+    Connections run in WAL mode so readers never block the writer, and sqlite3's
+    per-connection statement cache keeps every statement prepared after first use.
+    """
+
+    name = "sqlite"
+    autoid = "INTEGER PRIMARY KEY AUTOINCREMENT"
+
+    def connect(self):
+        conn = sqlite3.connect(
+            self.config.get("path", "yippee.db"),
+            timeout=self.config.get("busy_timeout", 10),
+            isolation_level=None,  # autocommit; transactions are opened explicitly by begin()
+            check_same_thread=False,  # connections move between threads through the pool
+            cached_statements=self.config.get("statement_cache_size", 256),
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def begin(self, conn):
+        # take the write lock up front: a deferred transaction that reads first cannot wait
+        # out busy_timeout when it later upgrades, it fails with "database is locked" at once
+        conn.execute("BEGIN IMMEDIATE")
+
+    def ping(self, conn):
+        conn.execute("SELECT 1")
+
+    def sql(self, statement):
+        return statement.replace("%s", "?")
+
+    def upsert(self, table, columns, keys, add=()):
+        updates = ", ".join(
+            f"{c}={c}+excluded.{c}" if c in add else f"{c}=excluded.{c}" for c in columns if c not in keys
+        )
+        return (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}"
+        )
+
+    def columns(self, cursor, table):
+        cursor.execute(f"PRAGMA table_info({table})")
+        return {row[1].lower() for row in cursor.fetchall()}
+
+    def indexes(self, cursor, table):
+        cursor.execute(f"PRAGMA index_list({table})")
+        return {row[1].lower() for row in cursor.fetchall()}
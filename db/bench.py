@@ -0,0 +1,201 @@
+# db/bench.py
+# Load-generation benchmark for the db layer. Simulates concurrent customers running the
+# same flows as app/main.py against the database in sqlDetails.json:
+#     python -m db.bench --customers 20 --duration 30
+#     python -m db.bench --customers 50 --duration 60 --json results.json
+#     python -m db.bench --startup 10      (cold-start time of `python -m app.main`)
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from db import sql
+from db.metrics import metrics
+
+PASSWORD = "bench-password"
+# cold start of `python -m app.main` (interpreter + imports, before the first prompt)
+STARTUP_TARGET_MS = 150
+
+
+# ===================================================
+# LATENCY RECORDING
+# ===================================================
+class Recorder:
+    """Collects per-operation latencies from all customer threads."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def timed(self, op, fn, *args):
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception:
+            with self._lock:
+                self.errors[op] += 1
+            return None
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.samples[op].append(elapsed)
+        return result
+
+    def report(self, wall):
+        """Summarize throughput and latency percentiles (ms) per operation."""
+        ops = {}
+        for op in sorted(set(self.samples) | set(self.errors)):
+            latencies = sorted(self.samples[op])
+            ops[op] = {
+                "count": len(latencies),
+                "errors": self.errors[op],
+                "ops_per_sec": len(latencies) / wall if wall else 0.0,
+                "p50_ms": _percentile(latencies, 50) * 1000,
+                "p95_ms": _percentile(latencies, 95) * 1000,
+                "p99_ms": _percentile(latencies, 99) * 1000,
+            }
+        total = sum(len(v) for v in self.samples.values())
+        return {"wall_seconds": wall, "total_ops": total, "ops_per_sec": total / wall if wall else 0.0, "ops": ops}
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+# ===================================================
+# SIMULATED CUSTOMER
+# ===================================================
+def prepare_customers(count):
+    """Make sure every simulated customer exists and has a saved card."""
+    for i in range(count):
+        email = f"bench-{i}@example.com"
+        exists, _ = sql.check_user(email)
+        if not exists:
+            sql.register(email, PASSWORD, f"Bench Customer {i}")
+            sql.add_payment(email, "4" + str(i).zfill(15), "123", "12/30", "Visa")
+
+
+def load_menus():
+    """Seeded menus as {restaurant: [(dish, price), ...]}."""
+    menus = defaultdict(list)
+    for restaurant, dish, price in sql.get_menu_items():
+        menus[restaurant].append((dish, price))
+    return dict(menus)
+
+
+def customer(index, menus, recorder, deadline, rng, place_order=sql.place_order):
+    """One customer session: log in, then browse / order / check history until the deadline."""
+    email = f"bench-{index}@example.com"
+    recorder.timed("check_user", sql.check_user, email)
+    recorder.timed("login", sql.login, email, PASSWORD)
+    restaurants = list(menus)
+
+    while time.monotonic() < deadline:
+        recorder.timed("get_restaurants", sql.get_restaurants)
+
+        restaurant = rng.choice(restaurants)
+        dishes = rng.sample(menus[restaurant], k=rng.randint(1, min(4, len(menus[restaurant]))))
+        cart = [(dish, rng.randint(1, 3)) for dish, _ in dishes]
+        recorder.timed("payment_summary", sql.payment_summary, email)
+        recorder.timed("place_order", place_order, email, restaurant, cart, time.time() + 1800)
+
+        recorder.timed("view_orders", sql.view_orders, email, None, 20)
+
+
+# ===================================================
+# ENTRY POINT
+# ===================================================
+def run(customers, duration, seed=None, order_queue=None):
+    prepare_customers(customers)
+    menus = load_menus()
+    if not menus:
+        raise SystemExit("❌ No menu items found - run db/setup.py first.")
+
+    recorder = Recorder()
+    place_order = order_queue.submit if order_queue else sql.place_order
+    rng = random.Random(seed)
+    start = time.monotonic()
+    deadline = start + duration
+    threads = [
+        threading.Thread(
+            target=customer,
+            args=(i, menus, recorder, deadline, random.Random(rng.random()), place_order),
+            daemon=True,
+        )
+        for i in range(customers)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if order_queue:
+        # queued orders only count once they are committed
+        recorder.timed("order_queue_flush", order_queue.flush)
+    return recorder.report(time.monotonic() - start)
+
+
+def measure_startup(runs):
+    """Launch the CLI `runs` times (with --help, so it exits after imports) and time each start."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "app.main", "--help"], check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def print_report(result):
+    print(f"\n{'operation':<18}{'count':>8}{'errors':>8}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for op, s in result["ops"].items():
+        print(
+            f"{op:<18}{s['count']:>8}{s['errors']:>8}{s['ops_per_sec']:>10.1f}"
+            f"{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}"
+        )
+    print(f"\nTotal: {result['total_ops']} ops in {result['wall_seconds']:.1f}s ({result['ops_per_sec']:.1f} ops/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the db layer with simulated customers.")
+    parser.add_argument("--customers", type=int, default=10, help="concurrent customers (threads)")
+    parser.add_argument("--duration", type=float, default=10, help="seconds to run")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible carts")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--queue", action="store_true", help="place orders through the write-behind order queue")
+    parser.add_argument("--startup", type=int, metavar="RUNS", help="measure CLI cold start instead")
+    args = parser.parse_args()
+
+    if args.startup:
+        timings = measure_startup(args.startup)
+        median = statistics.median(timings)
+        print(f"Cold start over {args.startup} runs: min {min(timings):.0f} ms, "
+              f"median {median:.0f} ms, max {max(timings):.0f} ms (target {STARTUP_TARGET_MS} ms)")
+        sys.exit(0 if median <= STARTUP_TARGET_MS else 1)
+
+    print(f"Running {args.customers} customers for {args.duration}s against the {sql.get_backend().name} backend...")
+    order_queue = None
+    if args.queue:
+        from db.orderqueue import OrderQueue
+
+        config = sql.get_config()
+        order_queue = OrderQueue(
+            spool_path=config.get("order_spool", "orders.spool"),
+            max_pending=config.get("order_queue_size", 1000),
+            batch_size=config.get("order_batch_size", 100),
+        )
+    result = run(args.customers, args.duration, args.seed, order_queue)
+    if order_queue:
+        order_queue.close()
+    print_report(result)
+    if args.json:
+        result["metrics"] = metrics.snapshot()
+        with open(args.json, "w") as f_json:
+            json.dump(result, f_json, indent=2)
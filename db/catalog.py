@@ -0,0 +1,88 @@
+# db/catalog.py
+import functools
+import threading
+import time
+from collections import namedtuple
+
+from db.sql import get_restaurants, get_menu_items
+
+Restaurant = namedtuple("Restaurant", ["name", "menu", "details"])
+
+# restaurants column -> details key shown in the UI
+DETAIL_COLUMNS = ["Location", "Phone", "Website", "Opening Hours", "Cuisine", "Rating"]
+
+
+# ===================================================
+# RESTAURANT CATALOG CACHE
+# ===================================================
+class Catalog:
+    """In-memory copy of the restaurants and menu_items tables.
+
+    Both tables are read once and kept for `ttl` seconds (or until `invalidate()`),
+    so browsing restaurants and menus costs no queries in the steady state. They are
+    read from the primary: db.pricing prices every order from this copy, and a lagging
+    replica could hand back a price that was just changed and keep it for a whole `ttl`.
+    """
+
+    def __init__(self, load_restaurants=functools.partial(get_restaurants, primary=True),
+                 load_menus=functools.partial(get_menu_items, primary=True), ttl=300):
+        self.load_restaurants = load_restaurants
+        self.load_menus = load_menus
+        self.ttl = ttl
+        self._restaurants = []
+        self._by_name = {}
+        self._loaded_at = None
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def all(self):
+        """Return every restaurant in table order."""
+        self._refresh_if_stale()
+        return self._restaurants
+
+    def get(self, name):
+        """Case-insensitive lookup by restaurant name; None if not found."""
+        self._refresh_if_stale()
+        return self._by_name.get(name.strip().lower())
+
+    def subscribe(self, callback):
+        """Call `callback(changed, removed)` after each reload that changed anything.
+
+        `changed` holds the new or modified Restaurants, `removed` the names that disappeared.
+        """
+        self._listeners.append(callback)
+
+    def invalidate(self):
+        """Drop the cached copy; the next read reloads from the database."""
+        with self._lock:
+            self._loaded_at = None
+
+    # -----------------------
+    # Internals
+    # -----------------------
+    def _refresh_if_stale(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return
+            menus = {}
+            for restaurant, dish, price in self.load_menus():
+                menus.setdefault(restaurant, {})[dish] = price
+            restaurants = [
+                Restaurant(row[0], menus.get(row[0], {}), dict(zip(DETAIL_COLUMNS, row[1:])))
+                for row in self.load_restaurants()
+            ]
+            previous = {r.name: r for r in self._restaurants}
+            changed = [r for r in restaurants if previous.pop(r.name, None) != r]
+            removed = list(previous)
+
+            self._restaurants = restaurants
+            self._by_name = {r.name.lower(): r for r in restaurants}
+            self._loaded_at = time.monotonic()
+        if changed or removed:
+            for callback in self._listeners:
+                callback(changed, removed)
+
+
+catalog = Catalog()
@@ -0,0 +1,112 @@
+# db/eta.py
+# Delivery time quotes from how busy each restaurant is right now. Tune in sqlDetails.json:
+#     eta_base_minutes (20)        quote for a restaurant with no orders in progress
+#     eta_minutes_per_order (1.5)  added for every order it still has to deliver
+#     eta_max_minutes (90)         upper bound of any quote
+#     eta_resync_seconds (300)     how often counts are re-read, to include other processes' orders
+import heapq
+import threading
+import time
+
+from db import sql
+
+
+class EtaEngine:
+    """In-memory counts of active (not yet delivered) orders per restaurant.
+
+    The counts are seeded from `orders` with one indexed `unix_time` range query, then
+    kept current by record() for every new order and by expiring orders once their
+    delivery time passes. Quoting a checkout is a dict lookup plus amortised expiry,
+    with no query per order.
+    """
+
+    def __init__(self, base_minutes=20, minutes_per_order=1.5, max_minutes=90, resync_seconds=300):
+        self.base_minutes = base_minutes
+        self.minutes_per_order = minutes_per_order
+        self.max_minutes = max_minutes
+        self.resync_seconds = resync_seconds
+        self._active = {}  # restaurant -> orders not delivered yet
+        self._due = []     # heap of (unix_time, restaurant) for every counted order
+        self._synced_at = None
+        self._recorded = None  # orders recorded while a seed query runs
+        self._lock = threading.Lock()
+
+    def seed(self):
+        """Replace the counts with the orders in `orders` still due after now."""
+        with self._lock:
+            if self._recorded is not None:
+                return self  # another thread is seeding
+            self._recorded = []
+        try:
+            now = time.time()
+            due = [(unix_time, restaurant) for restaurant, unix_time in sql.active_orders(now)]
+        except Exception:
+            with self._lock:
+                self._recorded = None
+            raise
+
+        with self._lock:
+            due += [entry for entry in self._recorded if entry[0] > now]
+            heapq.heapify(due)
+            active = {}
+            for _, restaurant in due:
+                active[restaurant] = active.get(restaurant, 0) + 1
+            self._due, self._active = due, active
+            self._synced_at, self._recorded = now, None
+        return self
+
+    def record(self, restaurant, unix_time):
+        """Count a newly placed order until its delivery time."""
+        entry = (unix_time, restaurant)
+        with self._lock:
+            if self._recorded is not None:
+                self._recorded.append(entry)
+            heapq.heappush(self._due, entry)
+            self._active[restaurant] = self._active.get(restaurant, 0) + 1
+
+    def active(self, restaurant, now=None):
+        """Orders of `restaurant` that are still being prepared or delivered."""
+        now = time.time() if now is None else now
+        with self._lock:
+            while self._due and self._due[0][0] <= now:
+                _, name = heapq.heappop(self._due)
+                left = self._active[name] - 1
+                if left:
+                    self._active[name] = left
+                else:
+                    del self._active[name]
+            return self._active.get(restaurant, 0)
+
+    def quote(self, restaurant, now=None):
+        """Delivery time in seconds for a new order from `restaurant`."""
+        now = time.time() if now is None else now
+        if self._synced_at is None or now - self._synced_at > self.resync_seconds:
+            self.seed()
+        minutes = min(self.base_minutes + self.minutes_per_order * self.active(restaurant, now), self.max_minutes)
+        return int(round(minutes * 60))
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_eta_engine():
+    """Process-wide EtaEngine configured from sqlDetails.json, seeded on first use."""
+    global _shared
+    if _shared is None:
+        config = sql.get_config()
+        with _shared_lock:
+            if _shared is None:
+                _shared = EtaEngine(
+                    base_minutes=config.get("eta_base_minutes", 20),
+                    minutes_per_order=config.get("eta_minutes_per_order", 1.5),
+                    max_minutes=config.get("eta_max_minutes", 90),
+                    resync_seconds=config.get("eta_resync_seconds", 300),
+                ).seed()
+    return _shared
+
+
+def note_order(restaurant, unix_time):
+    """Count a stored order in the shared engine, if this process quotes ETAs at all."""
+    if _shared is not None:
+        _shared.record(restaurant, unix_time)
@@ -0,0 +1,268 @@
+# db/importer.py
+# Load or refresh the restaurant catalog from CSV or JSON-lines files:
+#     python -m db.importer --restaurants restaurants.csv --menu menu.jsonl [--chunk 5000]
+#
+# restaurants: name, location, phone, website, opening_hours, cuisine, rating
+# menu:        restaurant, dish, price
+# Existing restaurants and dishes are updated in place; users and orders are never touched.
+import argparse
+import csv
+import itertools
+import json
+import os
+import time
+from decimal import Decimal, InvalidOperation
+
+from db.backends import load_config, from_config
+
+RESTAURANT_COLUMNS = ["name", "location", "phone", "website", "opening_hours", "cuisine", "rating"]
+MENU_COLUMNS = ["restaurant", "dish", "price"]
+# menu_items.price is DECIMAL(10,2)
+MAX_PRICE = Decimal("99999999.99")
+CENTS = Decimal("0.01")
+
+
+class InvalidRow(ValueError):
+    """A catalog row that cannot be imported."""
+
+
+# ===================================================
+# READING
+# ===================================================
+def read_rows(path):
+    """Yield (line number, dict) from a .csv file (with a header row) or a JSON-lines file.
+
+    JSON lines that are not an object yield None in place of the dict.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                # only objects are rows; a list, string or number is as unusable as bad JSON
+                yield number, row if isinstance(row, dict) else None
+
+
+def _text(row, key, required=False, limit=255):
+    value = row.get(key)
+    value = "" if value is None else str(value).strip()
+    if required and not value:
+        raise InvalidRow(f"missing {key}")
+    if len(value) > limit:
+        raise InvalidRow(f"{key} longer than {limit} characters")
+    return value or None
+
+
+def parse_price(value):
+    """A positive price with at most two decimal places, as a Decimal."""
+    try:
+        price = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        raise InvalidRow(f"price {value!r} is not a number")
+    if not price.is_finite() or price <= 0:
+        raise InvalidRow(f"price {value!r} must be greater than 0")
+    if price > MAX_PRICE:
+        raise InvalidRow(f"price {value!r} is too large")
+    if price != price.quantize(CENTS):
+        raise InvalidRow(f"price {value!r} has more than two decimal places")
+    return price.quantize(CENTS)
+
+
+def restaurant_values(row):
+    rating = _text(row, "rating")
+    if rating is not None:
+        try:
+            rating = Decimal(rating)
+        except InvalidOperation:
+            raise InvalidRow(f"rating {rating!r} is not a number")
+        if not rating.is_finite() or not 0 <= rating <= 5:
+            raise InvalidRow(f"rating {rating} is outside 0-5")
+    return (
+        _text(row, "name", required=True, limit=100),
+        _text(row, "location"),
+        _text(row, "phone", limit=50),
+        _text(row, "website"),
+        _text(row, "opening_hours", limit=50),
+        _text(row, "cuisine", limit=100),
+        rating,
+    )
+
+
+def menu_values(row):
+    return (
+        _text(row, "restaurant", required=True, limit=100),
+        _text(row, "dish", required=True, limit=100),
+        parse_price(row.get("price")),
+    )
+
+
+# ===================================================
+# IMPORTING
+# ===================================================
+class ImportStats:
+    """Counts and one-line progress for one file."""
+
+    def __init__(self, kind, quiet=False):
+        self.kind = kind
+        self.quiet = quiet
+        self.rows = 0
+        self.invalid = 0
+        self.errors = []  # first few (line, reason)
+        self.start = time.monotonic()
+
+    def reject(self, line, reason):
+        self.invalid += 1
+        if len(self.errors) < 10:
+            self.errors.append((line, reason))
+
+    @property
+    def rate(self):
+        return self.rows / max(time.monotonic() - self.start, 1e-9)
+
+    def report(self, final=False):
+        if self.quiet:
+            return
+        line = f"\r{self.kind}: {self.rows} rows imported, {self.invalid} rejected, {self.rate:.0f} rows/s"
+        if not final:
+            print(line, end="", flush=True)
+            return
+        print(line + f" ({time.monotonic() - self.start:.1f}s)")
+        for number, reason in self.errors:
+            print(f"   line {number}: {reason}")
+        if self.invalid > len(self.errors):
+            print(f"   ... and {self.invalid - len(self.errors)} more")
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _write_chunk(backend, conn, statements):
+    """Run [(statement, rows)] as one transaction."""
+    cursor = backend.cursor(conn)
+    backend.begin(conn)
+    try:
+        for statement, rows in statements:
+            cursor.executemany(statement, rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def import_restaurants(backend, conn, path, chunk_size=5000, quiet=False):
+    """Upsert every valid restaurant row of `path`, `chunk_size` rows per transaction."""
+    stats = ImportStats("restaurants", quiet)
+    upsert = backend.upsert("restaurants", RESTAURANT_COLUMNS, ["name"])
+    for chunk in _chunks(read_rows(path), chunk_size):
+        values = {}
+        for line, row in chunk:
+            try:
+                if row is None:
+                    raise InvalidRow("not a JSON object")
+                v = restaurant_values(row)
+                values[v[0]] = v  # the last row wins if a name repeats within a chunk
+            except InvalidRow as e:
+                stats.reject(line, str(e))
+        _write_chunk(backend, conn, [(upsert, list(values.values()))])
+        stats.rows += len(values)
+        stats.report()
+    stats.report(final=True)
+    return stats
+
+
+def import_menu(backend, conn, path, chunk_size=5000, quiet=False):
+    """Upsert every valid dish row of `path`, `chunk_size` rows per transaction.
+
+    Dishes of restaurants that do not exist are rejected; import restaurants first.
+    """
+    stats = ImportStats("menu", quiet)
+    upsert = backend.upsert("menu_items", MENU_COLUMNS, ["restaurant", "dish"])
+    cursor = backend.cursor(conn)
+    for chunk in _chunks(read_rows(path), chunk_size):
+        values = {}
+        for line, row in chunk:
+            try:
+                if row is None:
+                    raise InvalidRow("not a JSON object")
+                v = menu_values(row)
+                values[v[:2]] = (line, v)
+            except InvalidRow as e:
+                stats.reject(line, str(e))
+
+        # check the restaurants of this chunk only, so memory stays bounded by the chunk size
+        names = list({v[0] for _, v in values.values()})
+        known = set()
+        if names:
+            cursor.execute(
+                f"SELECT name FROM restaurants WHERE name IN ({', '.join(['%s'] * len(names))})", names
+            )
+            known = {row[0] for row in cursor.fetchall()}
+        rows = []
+        for line, v in values.values():
+            if v[0] in known:
+                rows.append(v)
+            else:
+                stats.reject(line, f"unknown restaurant {v[0]!r}")
+
+        _write_chunk(backend, conn, [(upsert, rows)])
+        stats.rows += len(rows)
+        stats.report()
+    cursor.close()
+    stats.report(final=True)
+    return stats
+
+
+def import_catalog(backend, conn, restaurants=None, menu=None, chunk_size=5000, quiet=False):
+    """Import a restaurants file and/or a menu file (restaurants first).
+
+    The catalog cache of this process is invalidated afterwards; other processes pick
+    the changes up when their cache expires.
+    """
+    from db.catalog import catalog
+
+    if restaurants:
+        import_restaurants(backend, conn, restaurants, chunk_size, quiet)
+    if menu:
+        import_menu(backend, conn, menu, chunk_size, quiet)
+    catalog.invalidate()
+
+
+SEED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "seed")
+SEED_RESTAURANTS = os.path.join(SEED_DIR, "restaurants.csv")
+SEED_MENU = os.path.join(SEED_DIR, "menu.csv")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load or refresh restaurants and menus from CSV / JSON-lines files.")
+    parser.add_argument("--restaurants", metavar="FILE", help="restaurants file (.csv or .jsonl)")
+    parser.add_argument("--menu", metavar="FILE", help="menu items file (.csv or .jsonl)")
+    parser.add_argument("--seed", action="store_true", help="load the bundled sample catalog (db/seed)")
+    parser.add_argument("--chunk", type=int, default=5000, help="rows per transaction")
+    args = parser.parse_args()
+    if args.seed:
+        args.restaurants, args.menu = SEED_RESTAURANTS, SEED_MENU
+    if not (args.restaurants or args.menu):
+        parser.error("give --restaurants and/or --menu (or --seed)")
+
+    backend = from_config(load_config())
+    conn = backend.connect()
+    try:
+        import_catalog(backend, conn, args.restaurants, args.menu, args.chunk)
+    finally:
+        conn.close()
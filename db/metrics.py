@@ -0,0 +1,164 @@
+# db/metrics.py
+import bisect
+import functools
+import json
+import logging
+import re
+import threading
+import time
+
+# upper bounds (ms) of the latency histogram buckets; anything slower lands in "+Inf"
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+slow_log = logging.getLogger("yippee.slow_query")
+# silent unless `slow_query_log` (or the application's own logging setup) gives it a destination,
+# so warnings never land on stderr in the middle of the CLI
+slow_log.addHandler(logging.NullHandler())
+
+
+# ===================================================
+# STATS
+# ===================================================
+class Stats:
+    """Call count, errors, rows and a latency histogram for one function or statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def observe(self, elapsed_ms, error=False):
+        self.count += 1
+        self.errors += error
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.buckets[bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+
+    def quantile(self, q):
+        """Bucket upper bound below which `q` of the observations fall."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.buckets):
+            seen += n
+            if seen >= target:
+                return bound
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "histogram": dict(zip([str(b) for b in BUCKETS_MS] + ["+Inf"], self.buckets)),
+        }
+
+
+# ===================================================
+# REGISTRY
+# ===================================================
+class Metrics:
+    """Process-wide registry of per-function and per-statement stats."""
+
+    def __init__(self):
+        self.functions = {}
+        self.statements = {}
+        self.slow_query_ms = 100
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def configure(self, slow_query_ms=None, slow_query_log=None):
+        """Set the slow-query threshold and optionally send the slow-query log to a file."""
+        if slow_query_ms is not None:
+            self.slow_query_ms = slow_query_ms
+        if slow_query_log:
+            handler = logging.FileHandler(slow_query_log)
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            slow_log.addHandler(handler)
+            slow_log.setLevel(logging.WARNING)
+
+    def record_function(self, name, elapsed_ms, error=False):
+        with self._lock:
+            self.functions.setdefault(name, Stats()).observe(elapsed_ms, error)
+
+    def record_statement(self, statement, elapsed_ms, error=False):
+        key = _normalize(statement)
+        with self._lock:
+            self.statements.setdefault(key, Stats()).observe(elapsed_ms, error)
+        if elapsed_ms >= self.slow_query_ms:
+            slow_log.warning("slow query (%.1f ms): %s", elapsed_ms, key)
+
+    def record_rows(self, statement, rows):
+        key = _normalize(statement)
+        with self._lock:
+            self.statements.setdefault(key, Stats()).rows += rows
+
+    def snapshot(self):
+        """All metrics as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                "since": self.started,
+                "taken": time.time(),
+                "functions": {k: v.to_dict() for k, v in sorted(self.functions.items())},
+                "statements": {k: v.to_dict() for k, v in sorted(self.statements.items())},
+            }
+
+    def dump(self, path):
+        """Write a snapshot to `path` as JSON."""
+        with open(path, "w") as f_json:
+            json.dump(self.snapshot(), f_json, indent=2)
+
+    def dump_every(self, path, interval):
+        """Write a snapshot to `path` every `interval` seconds from a daemon thread."""
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.dump(path)
+
+        thread = threading.Thread(target=loop, name="metrics-dump", daemon=True)
+        thread.start()
+        return thread
+
+    def reset(self):
+        with self._lock:
+            self.functions.clear()
+            self.statements.clear()
+            self.started = time.time()
+
+
+@functools.lru_cache(maxsize=512)
+def _normalize(statement):
+    """Collapse whitespace so the same statement always maps to one key."""
+    return re.sub(r"\s+", " ", statement).strip()
+
+
+metrics = Metrics()
+
+
+def instrumented(fn):
+    """Record call count, errors and latency of a db function."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        error = False
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            error = True
+            raise
+        finally:
+            metrics.record_function(name, (time.perf_counter() - start) * 1000, error)
+
+    return wrapper
@@ -0,0 +1,358 @@
+# db/migrate.py
+# Versioned, in-place schema migrations for the `yippee` database:
+#     python -m db.migrate            apply every pending migration
+#     python -m db.migrate --status   show applied / pending migrations
+import ast
+import json
+import sys
+
+from db.backends import load_config, from_config
+
+DETAIL_KEYS = {
+    "location": "Location",
+    "phone": "Phone",
+    "website": "Website",
+    "opening_hours": "Opening Hours",
+    "cuisine": "Cuisine",
+    "rating": "Rating",
+}
+
+
+# ===================================================
+# 1: str(dict) COLUMNS -> menu_items + restaurant attributes
+# ===================================================
+def normalize_menus(backend, conn):
+    """Split the old `menu`/`details` text columns into structured columns and `menu_items` rows."""
+    cursor = backend.cursor(conn)
+    columns = backend.columns(cursor, "restaurants")
+    if "menu" not in columns:
+        return
+
+    # DDL commits implicitly in MySQL, so every step checks whether it already ran
+    for column, ddl in [
+        ("location", "VARCHAR(255)"),
+        ("phone", "VARCHAR(50)"),
+        ("website", "VARCHAR(255)"),
+        ("opening_hours", "VARCHAR(50)"),
+        ("cuisine", "VARCHAR(100)"),
+        ("rating", "DECIMAL(2,1)"),
+    ]:
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE restaurants ADD COLUMN {column} {ddl}")
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS menu_items (
+            id {backend.autoid},
+            restaurant VARCHAR(100) NOT NULL,
+            dish VARCHAR(100) NOT NULL,
+            price DECIMAL(10,2) NOT NULL,
+            available BOOLEAN NOT NULL DEFAULT TRUE,
+            CONSTRAINT uq_menu_dish UNIQUE (restaurant, dish),
+            FOREIGN KEY (restaurant) REFERENCES restaurants(name) ON DELETE CASCADE ON UPDATE CASCADE
+        )
+    """)
+
+    cursor.execute("SELECT name, menu, details FROM restaurants")
+    rows = cursor.fetchall()
+
+    backend.begin(conn)
+    try:
+        for name, menu, details in rows:
+            menu = ast.literal_eval(menu) if menu else {}
+            details = ast.literal_eval(details) if details else {}
+            cursor.execute(
+                "UPDATE restaurants SET location=%s, phone=%s, website=%s, opening_hours=%s, cuisine=%s, rating=%s "
+                "WHERE name=%s",
+                [details.get(key) for key in DETAIL_KEYS.values()] + [name]
+            )
+            cursor.executemany(
+                backend.upsert("menu_items", ["restaurant", "dish", "price"], ["restaurant", "dish"]),
+                [(name, dish, price) for dish, price in menu.items()]
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    cursor.execute("ALTER TABLE restaurants DROP COLUMN menu, DROP COLUMN details")
+    cursor.close()
+
+
+# ===================================================
+# 2: INDEXES FOR THE HOT QUERIES
+# ===================================================
+HOT_INDEXES = [
+    # view_orders: newest-first page of one user's orders, answered from the index alone
+    ("orders", "idx_orders_user_history", "(username, id DESC, restaurant, unix_time, total_price)"),
+    # view_orders join: all items of an order without touching the clustered rows
+    ("order_items", "idx_order_items_order", "(order_id, id, dish, quantity, price)"),
+]
+
+
+def add_hot_indexes(backend, conn):
+    """Add covering indexes for order history and make payment.username unique.
+
+    check_user/login/retrieve_user already hit the userdata primary key. The payment
+    upsert in add_payment relies on a unique key that never existed, so duplicates
+    are removed (keeping each user's latest card) before the key is added.
+    """
+    cursor = backend.cursor(conn)
+    for table, name, columns in HOT_INDEXES:
+        if name not in backend.indexes(cursor, table):
+            cursor.execute(f"CREATE INDEX {name} ON {table} {columns}")
+
+    if "uq_payment_user" not in backend.indexes(cursor, "payment"):
+        cursor.execute("""
+            DELETE FROM payment WHERE id NOT IN (
+                SELECT id FROM (SELECT MAX(id) AS id FROM payment GROUP BY username) latest
+            )
+        """)
+        cursor.execute("CREATE UNIQUE INDEX uq_payment_user ON payment (username)")
+    cursor.close()
+
+
+# ===================================================
+# 3: CLIENT-SIDE ORDER REFERENCES
+# ===================================================
+def add_order_refs(backend, conn):
+    """Add `orders.order_ref`, the id a queued order gets before it reaches the database.
+
+    The unique key lets the order queue (db/orderqueue.py) replay its spool after a
+    crash without inserting an order twice. Orders placed directly keep it NULL.
+    """
+    cursor = backend.cursor(conn)
+    if "order_ref" not in backend.columns(cursor, "orders"):
+        cursor.execute("ALTER TABLE orders ADD COLUMN order_ref VARCHAR(36)")
+    if "uq_orders_ref" not in backend.indexes(cursor, "orders"):
+        cursor.execute("CREATE UNIQUE INDEX uq_orders_ref ON orders (order_ref)")
+    cursor.close()
+
+
+# ===================================================
+# 4: ONE ENCRYPTED TOKEN PER SAVED CARD
+# ===================================================
+PAYMENT_FIELDS = ["card", "cvv", "expiry", "cardtype"]
+
+
+def single_token_payments(backend, conn):
+    """Replace the four per-field Fernet tokens in `payment` with one token plus a display column.
+
+    `payload` holds the whole card as one encrypted JSON record; `display` holds the
+    card type and last four digits in plain text, so showing a saved card needs no
+    decryption at all. Existing rows are re-encrypted with FERNET_KEY. If any row does
+    not decrypt, nothing is changed and the migration fails, so it can be rerun with
+    the right key; the old columns are only dropped once every card is converted.
+    """
+    cursor = backend.cursor(conn)
+    columns = backend.columns(cursor, "payment")
+    if "card" not in columns:
+        return
+
+    for column, ddl in [("payload", "VARCHAR(512)"), ("display", "VARCHAR(64)")]:
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE payment ADD COLUMN {column} {ddl}")
+
+    cursor.execute("SELECT id, card, cvv, expiry, cardtype FROM payment WHERE payload IS NULL")
+    rows = cursor.fetchall()
+    if rows:
+        from db.sql import fernet
+
+        f = fernet()
+        updates, failed = [], []
+        for row_id, *tokens in rows:
+            try:
+                card = dict(zip(PAYMENT_FIELDS, (f.decrypt(t.encode()).decode() for t in tokens)))
+            except Exception:
+                failed.append(row_id)
+                continue
+            updates.append(
+                (f.encrypt(json.dumps(card).encode()).decode(), f"{card['cardtype']} {card['card'][-4:]}", row_id)
+            )
+        if failed:
+            cursor.close()
+            raise ValueError(
+                f"❌ {len(failed)} saved cards (payment ids {failed[:10]}) do not decrypt with FERNET_KEY; "
+                "nothing was changed. Set the key they were saved with and run the migration again."
+            )
+
+        backend.begin(conn)
+        try:
+            cursor.executemany("UPDATE payment SET payload=%s, display=%s WHERE id=%s", updates)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    # one column per statement: SQLite cannot drop several at once
+    for column in PAYMENT_FIELDS:
+        cursor.execute(f"ALTER TABLE payment DROP COLUMN {column}")
+    cursor.close()
+
+
+# ===================================================
+# 5: ARCHIVE TABLES FOR DELIVERED ORDERS
+# ===================================================
+def add_order_archive(backend, conn):
+    """Create `orders_archive` / `order_items_archive`, where db/archive.py moves old orders.
+
+    Rows keep their original ids, so order history pages by id across both tables.
+    """
+    cursor = backend.cursor(conn)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS orders_archive (
+            id INT PRIMARY KEY,
+            username VARCHAR(100),
+            restaurant VARCHAR(100),
+            unix_time DOUBLE,
+            total_price DECIMAL(10,2),
+            order_ref VARCHAR(36),
+            FOREIGN KEY (username) REFERENCES userdata(username) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS order_items_archive (
+            id INT PRIMARY KEY,
+            order_id INT,
+            dish VARCHAR(100),
+            quantity INT,
+            price DECIMAL(10,2),
+            FOREIGN KEY (order_id) REFERENCES orders_archive(id) ON DELETE CASCADE
+        )
+    """)
+    for table, name, columns in [
+        ("orders_archive", "idx_orders_archive_user_history", "(username, id DESC, restaurant, unix_time, total_price)"),
+        ("order_items_archive", "idx_order_items_archive_order", "(order_id, id, dish, quantity, price)"),
+    ]:
+        if name not in backend.indexes(cursor, table):
+            cursor.execute(f"CREATE INDEX {name} ON {table} {columns}")
+    cursor.close()
+
+
+# ===================================================
+# 6: ORDER STATISTICS SUMMARY TABLES
+# ===================================================
+def add_order_stats(backend, conn):
+    """Create the summary tables of db/stats.py and fill them from the existing orders.
+
+    From here on place_order keeps them current, so "how much have I spent" and
+    "top restaurants" are primary-key or index reads instead of scans of the history.
+    """
+    cursor = backend.cursor(conn)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_stats (
+            username VARCHAR(100) PRIMARY KEY,
+            order_count INT NOT NULL DEFAULT 0,
+            total_spent DECIMAL(14,2) NOT NULL DEFAULT 0,
+            FOREIGN KEY (username) REFERENCES userdata(username) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS restaurant_stats (
+            restaurant VARCHAR(100) PRIMARY KEY,
+            order_count INT NOT NULL DEFAULT 0,
+            revenue DECIMAL(14,2) NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS dish_stats (
+            restaurant VARCHAR(100) NOT NULL,
+            dish VARCHAR(100) NOT NULL,
+            quantity INT NOT NULL DEFAULT 0,
+            revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (restaurant, dish)
+        )
+    """)
+    for table, name, columns in [
+        # top restaurants / top dishes read the first rows of these indexes
+        ("restaurant_stats", "idx_restaurant_stats_orders", "(order_count)"),
+        ("dish_stats", "idx_dish_stats_quantity", "(quantity)"),
+    ]:
+        if name not in backend.indexes(cursor, table):
+            cursor.execute(f"CREATE INDEX {name} ON {table} {columns}")
+    cursor.close()
+
+    from db.stats import rebuild
+
+    rebuild(backend, conn)
+
+
+# ===================================================
+# 7: DELIVERY TIME INDEX
+# ===================================================
+def add_due_index(backend, conn):
+    """Index orders by delivery time, covering the restaurant.
+
+    db/eta.py seeds its active-order counts with a range scan of it, and
+    archive_orders finds the first order still due with it.
+    """
+    cursor = backend.cursor(conn)
+    if "idx_orders_due" not in backend.indexes(cursor, "orders"):
+        cursor.execute("CREATE INDEX idx_orders_due ON orders (unix_time, restaurant)")
+    cursor.close()
+
+
+# ===================================================
+# MIGRATION RUNNER
+# ===================================================
+MIGRATIONS = [
+    (1, "normalize restaurant menus into menu_items", normalize_menus),
+    (2, "covering indexes for order history and payment lookups", add_hot_indexes),
+    (3, "order_ref column for queued orders", add_order_refs),
+    (4, "single encrypted token and display column for saved cards", single_token_payments),
+    (5, "archive tables for delivered orders", add_order_archive),
+    (6, "order statistics summary tables", add_order_stats),
+    (7, "delivery time index for ETA quotes", add_due_index),
+]
+
+
+def current_version(backend, conn):
+    """Return the highest applied migration number (0 for a fresh database)."""
+    cursor = backend.cursor(conn)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            description VARCHAR(255),
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    version = cursor.fetchone()[0]
+    cursor.close()
+    return version
+
+
+def migrate(backend, conn, target=None):
+    """Apply every pending migration up to `target` (default: latest), in order."""
+    version = current_version(backend, conn)
+    applied = []
+    for number, description, step in MIGRATIONS:
+        if number <= version or (target is not None and number > target):
+            continue
+        print(f"Applying migration {number}: {description}...")
+        step(backend, conn)
+        cursor = backend.cursor(conn)
+        cursor.execute(
+            "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+            (number, description)
+        )
+        conn.commit()
+        cursor.close()
+        applied.append(number)
+    return applied
+
+
+if __name__ == "__main__":
+    backend = from_config(load_config())
+    conn = backend.connect()
+    if "--status" in sys.argv:
+        version = current_version(backend, conn)
+        for number, description, _ in MIGRATIONS:
+            state = "applied" if number <= version else "pending"
+            print(f"{number:>3}  {state:<8} {description}")
+    else:
+        applied = migrate(backend, conn)
+        if applied:
+            print(f"✅ Schema is now at version {applied[-1]}.")
+        else:
+            print("Schema is already up to date.")
+    conn.close()
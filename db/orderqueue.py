@@ -0,0 +1,320 @@
+# db/orderqueue.py
+# Write-behind order pipeline. Enable it in sqlDetails.json:
+#     {"order_queue": true, "order_queue_size": 1000, "order_batch_size": 100, "order_spool": "orders.spool"}
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from decimal import Decimal
+
+from db import sql
+from db.pricing import price_cart
+
+# the writer runs inside the CLI too, so it never prints; see app.server for where this shows up
+log = logging.getLogger("yippee.orderqueue")
+log.addHandler(logging.NullHandler())
+
+
+class OrderQueueFull(Exception):
+    """The queue stayed full for the whole submit timeout (the writer is falling behind)."""
+
+
+class OrderQueueClosed(Exception):
+    """submit() was called after close()."""
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# ===================================================
+# SPOOL
+# ===================================================
+class Spool:
+    """Append-only JSONL log of accepted orders, fsynced before submit() returns.
+
+    Each accepted order is one {"order": [...]} line; each committed batch adds a
+    {"done": [refs]} line. Orders without a matching "done" are replayed on start.
+    Concurrent appends share fsyncs: whoever syncs covers every line written so far.
+    rewrite() compacts the file down to the orders still outstanding.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._written = 0  # lines written
+        self._synced = 0   # lines known to be on disk
+        self.lines = 0     # lines in the current file
+        self._file = None
+
+    def pending(self):
+        """Orders accepted but not marked done, in submit order."""
+        if not os.path.exists(self.path):
+            return []
+        orders, done = {}, set()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # torn last line from a crash mid-write
+                if "order" in record:
+                    orders[record["order"][0]] = record["order"]
+                else:
+                    done.update(record["done"])
+        return [order for ref, order in orders.items() if ref not in done]
+
+    def open(self, pending=()):
+        """Rewrite the spool with only `pending` orders and keep it open for appends."""
+        self._replace(pending)
+
+    def rewrite(self, pending):
+        """Atomically replace the file with only the `pending` orders, while appends wait."""
+        with self._sync_lock, self._lock:
+            self._file.close()
+            self._replace(pending)
+            self._synced = self._written  # every earlier line that still matters is in the new file
+
+    def _replace(self, pending):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for order in pending:
+                f.write(json.dumps({"order": order}, default=_json_default) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self.lines = len(pending)
+
+    def append(self, record):
+        line = json.dumps(record, default=_json_default) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._written += 1
+            self.lines += 1
+            seq = self._written
+        with self._sync_lock:
+            if self._synced >= seq:
+                return
+            with self._lock:
+                target = self._written
+            os.fsync(self._file.fileno())
+            self._synced = target
+
+    def close(self, truncate=False):
+        with self._lock:
+            if self._file is not None:
+                if truncate:
+                    self._file.truncate(0)
+                self._file.close()
+                self._file = None
+
+
+# ===================================================
+# ORDER QUEUE
+# ===================================================
+class OrderQueue:
+    """Accepts orders at once and writes them to the database in batches.
+
+    submit() spools the order to disk, queues it and returns a Future right away;
+    its `ref` is the order's permanent reference and its result is the database
+    order id once the batch commits. A single writer thread drains up to
+    `batch_size` orders at a time (waiting up to `linger` seconds for a batch to
+    fill) and inserts them with one transaction via sql.place_orders. When
+    `max_pending` orders are waiting, submit() blocks for up to `timeout` seconds
+    and then raises OrderQueueFull. A failed batch is retried one order at a time:
+    an order the database refuses (e.g. a foreign key error) fails its Future and
+    is dropped, while orders hit by an outage stay in the spool and are retried.
+    Anything left over after a crash is replayed on the next start. Once the spool
+    holds `compact_after` lines it is rewritten with only the outstanding orders.
+    """
+
+    def __init__(self, spool_path="orders.spool", max_pending=1000, batch_size=100, linger=0.005,
+                 retry_delay=1.0, compact_after=10000):
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.linger = linger
+        self.retry_delay = retry_delay
+        self.compact_after = compact_after
+        self._queue = queue.Queue()
+        self._slots = threading.Semaphore(max_pending)
+        self._outstanding = {}  # ref -> order, accepted but not yet written or refused
+        self._idle = threading.Condition()
+        self._spool = Spool(spool_path)
+        self._closed = False
+        self._stop = threading.Event()
+
+        replay = self._spool.pending()
+        self._spool.open(replay)
+        for order in replay:
+            future = Future()
+            # replayed orders take free slots but never wait for one
+            future.ref, future.slot = order[0], self._slots.acquire(blocking=False)
+            self._reserve(order)
+            self._queue.put((order, future))
+        self._writer = threading.Thread(target=self._run, name="order-writer", daemon=True)
+        self._writer.start()
+
+    def submit(self, username, restaurant, items, unix, timeout=None):
+        """Price and queue one order of (dish, quantity) lines.
+
+        Returns a Future with `.ref` and the priced `.cart` set, resolving to the order id.
+        Raises PricingError at once for an invalid cart.
+        """
+        if self._closed:
+            raise OrderQueueClosed("The order queue is closed.")
+        cart = price_cart(restaurant, items)
+        lines = [[line.dish, line.quantity, line.price] for line in cart.lines]
+        order = [str(uuid.uuid4()), username, cart.restaurant, lines, unix, cart.total]
+        future = Future()
+        future.ref, future.cart, future.slot = order[0], cart, True
+        if not self._slots.acquire(timeout=timeout):
+            raise OrderQueueFull(f"{self.max_pending} orders are already waiting to be written.")
+        # counted before it reaches the spool, so a compaction never drops its line
+        self._reserve(order)
+        try:
+            self._spool.append({"order": order})
+        except BaseException:
+            self._release([(order, future)])
+            raise
+        self._queue.put((order, future))
+        return future
+
+    def _reserve(self, order):
+        with self._idle:
+            self._outstanding[order[0]] = order
+
+    def _release(self, batch):
+        """Forget finished orders; compact the spool when it has grown past `compact_after` lines."""
+        for _, future in batch:
+            if future.slot:
+                self._slots.release()
+        with self._idle:
+            for order, _ in batch:
+                self._outstanding.pop(order[0], None)
+            if self._spool.lines >= self.compact_after:
+                self._spool.rewrite(list(self._outstanding.values()))
+            self._idle.notify_all()
+
+    def pending(self):
+        """Orders accepted but not yet committed."""
+        return len(self._outstanding)
+
+    def flush(self, timeout=None):
+        """Block until every order submitted so far is written or refused; False if `timeout` ran out."""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._outstanding, timeout)
+
+    def close(self, timeout=30):
+        """Stop accepting orders, write out everything queued and stop the writer.
+
+        Orders that could not be written within `timeout` seconds stay in the spool
+        and are replayed by the next OrderQueue on the same file.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        flushed = self.flush(timeout)
+        self._stop.set()
+        self._queue.put((None, None))
+        self._writer.join(self.retry_delay + 5)
+        self._spool.close(truncate=flushed)
+
+    # -----------------------
+    # Writer
+    # -----------------------
+    def _run(self):
+        batch = None
+        while not (batch is None and self._stop.is_set() and self._queue.empty()):
+            batch = batch or self._next_batch()
+            if batch is None:
+                continue
+            try:
+                ids = sql.place_orders([tuple(order) for order, _ in batch])
+            except Exception:
+                if self._stop.is_set():
+                    return  # shutting down with the database gone; the spool keeps the batch
+                batch = self._write_singly(batch)
+                if batch:
+                    time.sleep(self.retry_delay)
+                continue
+            self._finish(batch, ids)
+            batch = None
+
+    def _write_singly(self, batch):
+        """Write a failed batch one order at a time, dropping the orders the database refuses.
+
+        Returns the orders left to retry when the failure looks like an outage, else None.
+        """
+        backend = sql.get_backend()
+        for i, (order, future) in enumerate(batch):
+            try:
+                ids = sql.place_orders([tuple(order)])
+            except Exception as e:
+                if not (backend.is_data_error(e) or isinstance(e, (LookupError, TypeError, ValueError))):
+                    log.warning("Writing queued orders failed (%s); retrying in %ss", e, self.retry_delay)
+                    return batch[i:]
+                log.error("Dropping queued order %s: the database refused it (%s)", order[0], e)
+                self._finish([(order, future)], error=e)
+                continue
+            self._finish([(order, future)], ids)
+        return None
+
+    def _finish(self, batch, ids=None, error=None):
+        """Mark `batch` done in the spool and resolve its Futures with the order ids (or `error`)."""
+        self._spool.append({"done": [order[0] for order, _ in batch]})
+        for order, future in batch:
+            if error is None:
+                future.set_result(ids.get(order[0]))
+            else:
+                future.set_exception(error)
+        self._release(batch)
+
+    def _next_batch(self):
+        """Wait for the first order, then take whatever else arrives within `linger`."""
+        item = self._queue.get()
+        if item[0] is None:
+            return None
+        batch = [item]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item[0] is None:
+                self._queue.put(item)  # stop on the next round
+                break
+            batch.append(item)
+        return batch
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_order_queue():
+    """The process-wide OrderQueue, or None unless `order_queue` is enabled in sqlDetails.json."""
+    global _shared
+    config = sql.get_config()
+    if not config.get("order_queue"):
+        return None
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = OrderQueue(
+                    spool_path=config.get("order_spool", "orders.spool"),
+                    max_pending=config.get("order_queue_size", 1000),
+                    batch_size=config.get("order_batch_size", 100),
+                )
+                atexit.register(_shared.close)
+    return _shared
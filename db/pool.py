@@ -0,0 +1,145 @@
+# db/pool.py
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolExhausted(Exception):
+    """Raised when no connection becomes free within the checkout timeout."""
+
+
+# handed to a waiter instead of a connection: "a slot is free, open your own"
+_OPEN_NEW = object()
+
+
+# ===================================================
+# CONNECTION POOL
+# ===================================================
+class ConnectionPool:
+    """Fixed-size pool of database connections.
+
+    Connections come from `backend.connect()` and are created lazily up to
+    `size`. They are checked for health on checkout and reopened if the server
+    went away, so one dropped connection never takes the process down.
+    Returned connections go to the longest-waiting caller first, so no thread
+    starves under load.
+    """
+
+    def __init__(self, backend, size=5, timeout=10, ping_interval=30):
+        self.backend = backend
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self._idle = []          # stack of (conn, last_used); most recently used on top
+        self._waiters = deque()  # [event, handed_item] in arrival order
+        self._created = 0
+        self._lock = threading.Lock()
+
+    # -----------------------
+    # Checkout / Checkin
+    # -----------------------
+    def checkout(self):
+        """Take a healthy connection from the pool, opening one if allowed."""
+        with self._lock:
+            if self._idle and not self._waiters:
+                item = self._idle.pop()
+            elif self._created < self.size:
+                self._created += 1
+                item = _OPEN_NEW
+            else:
+                waiter = [threading.Event(), None]
+                self._waiters.append(waiter)
+                item = None
+
+        if item is None:
+            waiter[0].wait(self.timeout)
+            with self._lock:
+                item = waiter[1]
+                if item is None:
+                    self._waiters.remove(waiter)
+                    raise PoolExhausted(f"No free connection after {self.timeout}s (pool size {self.size})")
+
+        if item is _OPEN_NEW:
+            return self._open()
+        conn, last_used = item
+        if time.monotonic() - last_used > self.ping_interval:
+            conn = self._ensure_alive(conn)
+        return conn
+
+    def checkin(self, conn, broken=False):
+        """Return a connection to the pool, discarding it if it is broken."""
+        if broken:
+            self._discard(conn)
+            return
+        self._hand_off((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks a connection out and back in."""
+        conn = self.checkout()
+        broken = False
+        try:
+            yield conn
+        except Exception as e:
+            broken = self.backend.is_connection_error(e)
+            raise
+        finally:
+            self.checkin(conn, broken=broken)
+
+    @property
+    def in_use(self):
+        """Connections currently checked out (or being opened)."""
+        with self._lock:
+            return self._created - len(self._idle)
+
+    def close(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for conn, _ in idle:
+            _close_quietly(conn)
+
+    # -----------------------
+    # Internals
+    # -----------------------
+    def _hand_off(self, item):
+        """Give a free connection (or a free slot) to the oldest waiter, else park it."""
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter[1] = item
+                waiter[0].set()
+            elif item is _OPEN_NEW:
+                self._created -= 1
+            else:
+                self._idle.append(item)
+
+    def _open(self):
+        """Open a connection for a slot that has already been reserved."""
+        try:
+            return self.backend.connect()
+        except Exception:
+            self._hand_off(_OPEN_NEW)
+            raise
+
+    def _ensure_alive(self, conn):
+        """Ping the connection; replace it with a fresh one if the ping fails."""
+        try:
+            self.backend.ping(conn)
+            return conn
+        except Exception:
+            _close_quietly(conn)
+            return self._open()
+
+    def _discard(self, conn):
+        _close_quietly(conn)
+        self._hand_off(_OPEN_NEW)
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
@@ -0,0 +1,117 @@
+# db/pricing.py
+import threading
+from collections import namedtuple
+from decimal import Decimal
+
+CENTS = Decimal("0.01")
+MAX_QUANTITY = 99
+
+PricedLine = namedtuple("PricedLine", ["dish", "quantity", "unit_price", "price"])
+PricedCart = namedtuple("PricedCart", ["restaurant", "lines", "total"])
+
+
+class PricingError(ValueError):
+    """The cart names an unknown restaurant or dish, or an invalid quantity."""
+
+
+def to_price(value):
+    """Exact Decimal for a price as stored (Decimal, int, float or text)."""
+    return Decimal(str(value)).quantize(CENTS)
+
+
+# ===================================================
+# PRICE INDEX
+# ===================================================
+class PriceIndex:
+    """Per-restaurant Decimal prices of every available dish, kept in step with db.catalog.
+
+    Each restaurant's menu is compiled once into {lower-cased dish: (dish, price)}, so
+    pricing a cart is one dict lookup per line and never touches the database.
+    """
+
+    def __init__(self):
+        self._catalog = None
+        self._menus = {}  # restaurant -> {dish.lower(): (dish, Decimal price)}
+        self._lock = threading.Lock()
+
+    def follow(self, catalog):
+        """Index everything in `catalog` now and recompile a menu whenever it changes."""
+        self._catalog = catalog
+        catalog.subscribe(self._on_catalog_change)
+        self._on_catalog_change(catalog.all(), [])
+        return self
+
+    def _on_catalog_change(self, changed, removed):
+        compiled = {
+            r.name: {dish.lower(): (dish, to_price(price)) for dish, price in r.menu.items()}
+            for r in changed
+        }
+        with self._lock:
+            for name in removed:
+                self._menus.pop(name, None)
+            self._menus.update(compiled)
+
+    def price(self, restaurant, items):
+        """Price a cart of (dish, quantity) lines for one restaurant.
+
+        Dish names match case-insensitively and repeated dishes are merged into one
+        line (in first-seen order). Every line is checked before anything is raised,
+        so the error lists all problems at once. Returns a PricedCart whose line
+        prices and total are exact Decimals.
+        """
+        if self._catalog is not None:
+            r = self._catalog.get(restaurant)  # also reloads the catalog when it is stale
+            restaurant = r.name if r is not None else restaurant
+        menu = self._menus.get(restaurant)
+        if menu is None:
+            raise PricingError(f"Unknown restaurant {restaurant!r}.")
+
+        quantities = {}
+        problems = []
+        for dish, qty in items:
+            entry = menu.get(str(dish).strip().lower())
+            if entry is None:
+                problems.append(f"{dish!r} is not on the menu")
+                continue
+            try:
+                qty = int(qty)
+            except (TypeError, ValueError):
+                problems.append(f"invalid quantity {qty!r} for {entry[0]}")
+                continue
+            if qty < 1:
+                problems.append(f"invalid quantity {qty} for {entry[0]}")
+                continue
+            quantities[entry] = quantities.get(entry, 0) + qty
+
+        for (dish, _), qty in quantities.items():
+            if qty > MAX_QUANTITY:
+                problems.append(f"at most {MAX_QUANTITY} x {dish} per order")
+        if problems:
+            message = "; ".join(problems)
+            raise PricingError(message[0].upper() + message[1:] + ".")
+        if not quantities:
+            raise PricingError("Cart is empty.")
+
+        lines = [PricedLine(dish, qty, unit, unit * qty) for (dish, unit), qty in quantities.items()]
+        return PricedCart(restaurant, lines, sum((line.price for line in lines), Decimal("0.00")))
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_price_index():
+    """Process-wide index that follows db.catalog, built on first use."""
+    global _shared
+    if _shared is None:
+        from db.catalog import catalog
+
+        with _shared_lock:
+            if _shared is None:
+                _shared = PriceIndex().follow(catalog)
+    return _shared
+
+
+def price_cart(restaurant, items):
+    """Price (dish, quantity) lines with the shared index; see PriceIndex.price."""
+    return get_price_index().price(restaurant, items)
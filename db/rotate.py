@@ -0,0 +1,223 @@
+# db/rotate.py
+# Re-encrypt every stored secret with the newest key in FERNET_KEY:
+#     1. put the new key first:   FERNET_KEY=<new key>,<old key>
+#     2. run:                     python -m db.rotate [--chunk 1000] [--workers 8]
+#     3. drop the old key from FERNET_KEY once it reports completion
+# Interrupted runs pick up where they stopped (see --checkpoint).
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from db import sql
+
+# (table, primary key, encrypted column), rotated in this order
+TARGETS = [
+    ("userdata", "username", "password"),
+    ("payment", "id", "payload"),
+]
+
+
+# ===================================================
+# WORKERS
+# ===================================================
+_worker_fernet = None
+
+
+def _init_worker(keys):
+    global _worker_fernet
+    from cryptography.fernet import Fernet, MultiFernet
+
+    _worker_fernet = MultiFernet([Fernet(k) for k in keys])
+
+
+def rotate_chunk(rows):
+    """Re-encrypt (primary key, token) rows with the newest key.
+
+    Returns the UPDATE parameters (new token, primary key, old token) and the number
+    of tokens that no configured key could decrypt.
+    """
+    from cryptography.fernet import InvalidToken
+
+    updates, failed = [], 0
+    for key, token in rows:
+        try:
+            updates.append((_worker_fernet.rotate(token.encode()).decode(), key, token))
+        except InvalidToken:
+            failed += 1
+    return updates, failed
+
+
+# ===================================================
+# CHECKPOINT / PROGRESS
+# ===================================================
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f_json:
+        return json.load(f_json)
+
+
+def save_checkpoint(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f_json:
+        json.dump(state, f_json)
+        f_json.flush()
+        os.fsync(f_json.fileno())
+    os.replace(tmp, path)
+
+
+class Progress:
+    """One-line progress report: rows done, rate and time left.
+
+    `done` counts every row read; `rotated` only the tokens actually re-encrypted.
+    """
+
+    def __init__(self, table, total, failed=0):
+        self.table = table
+        self.total = total
+        self.done = 0
+        self.rotated = 0
+        self.failed = failed  # includes failures from before a resume
+        self.start = time.monotonic()
+
+    def update(self, rows, rotated, failed):
+        self.done += rows
+        self.rotated += rotated
+        self.failed += failed
+        elapsed = max(time.monotonic() - self.start, 1e-9)
+        rate = self.done / elapsed
+        left = (self.total - self.done) / rate if rate else 0
+        pct = 100 * self.done / self.total if self.total else 100
+        print(
+            f"\r{self.table}: {self.done}/{self.total} rows ({pct:.0f}%), {rate:.0f} rows/s, ~{left:.0f}s left",
+            end="", flush=True,
+        )
+
+    def finish(self):
+        elapsed = time.monotonic() - self.start
+        print(f"\r{self.table}: {self.rotated} rows re-encrypted in {elapsed:.1f}s" + " " * 20)
+        if self.failed:
+            print(f"⚠️ {self.failed} {self.table} rows could not be decrypted with any key and were left as is.")
+
+
+# ===================================================
+# ROTATION
+# ===================================================
+def rotate(chunk_size=1000, workers=None, checkpoint="rotate.checkpoint", restart=False):
+    """Re-encrypt every TARGETS column with the first key in FERNET_KEY.
+
+    Rows are streamed in primary-key order from a server-side cursor, `chunk_size`
+    at a time. Up to two chunks per worker process are being re-encrypted at once.
+    Each chunk is written back in its own short transaction, so live logins are
+    never blocked for long. A row changed by the app meanwhile (a new password, a
+    new card) is left alone, since its new token already uses the newest key. The
+    last written key per table goes to `checkpoint` after every commit, so an
+    interrupted run resumes from there.
+
+    Returns the number of tokens no key could decrypt; those rows are left as they
+    are, so the older keys must stay in FERNET_KEY while it is not 0.
+    """
+    keys = sql.fernet_keys()
+    if len(keys) == 1:
+        print("Only one key in FERNET_KEY: tokens are re-encrypted with the same key.")
+    backend = sql.get_backend()
+    state = {} if restart else load_checkpoint(checkpoint)
+    workers = workers or os.cpu_count() or 1
+    failed = 0
+
+    read_conn, write_conn = backend.connect(), backend.connect()
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(keys,)) as pool:
+            for table, pk, column in TARGETS:
+                progress = state.get(table, {})
+                if progress.get("done"):
+                    print(f"{table}: already rotated (checkpoint)")
+                    failed += progress.get("failed", 0)
+                    continue
+                failed += _rotate_table(backend, pool, workers * 2, read_conn, write_conn, table, pk, column,
+                                        progress.get("last"), progress.get("failed", 0), chunk_size,
+                                        state, checkpoint)
+    finally:
+        read_conn.close()
+        write_conn.close()
+
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    if failed:
+        print(f"⚠️ {failed} secrets could not be decrypted with any key in FERNET_KEY. Do not remove the "
+              "older keys: those rows are still encrypted with a key that is not in FERNET_KEY.")
+    else:
+        print("✅ Every secret now uses the first key in FERNET_KEY; older keys can be removed.")
+    return failed
+
+
+def _rotate_table(backend, pool, max_in_flight, read_conn, write_conn,
+                  table, pk, column, last, failed, chunk_size, state, checkpoint):
+    """Rotate one column; returns how many of its tokens could not be decrypted."""
+    where, params = (f" WHERE {pk} > %s", (last,)) if last is not None else ("", ())
+
+    counter = backend.cursor(read_conn)
+    counter.execute(f"SELECT COUNT(*) FROM {table}{where}", params)
+    progress = Progress(table, counter.fetchone()[0], failed)
+    counter.close()
+
+    reader = backend.streaming_cursor(read_conn)
+    reader.execute(f"SELECT {pk}, {column} FROM {table}{where} ORDER BY {pk}", params)
+    writer = backend.cursor(write_conn)
+    update = f"UPDATE {table} SET {column}=%s WHERE {pk}=%s AND {column}=%s"
+
+    def write_oldest():
+        last_key, count, future = in_flight.popleft()
+        updates, failed = future.result()
+        backend.begin(write_conn)
+        try:
+            writer.executemany(update, updates)
+            write_conn.commit()
+        except Exception:
+            write_conn.rollback()
+            raise
+        progress.update(count, len(updates), failed)
+        state[table] = {"last": last_key, "failed": progress.failed}
+        save_checkpoint(checkpoint, state)
+
+    in_flight = deque()  # (last primary key, rows, future) in read order
+    try:
+        while True:
+            rows = reader.fetchmany(chunk_size)
+            if not rows:
+                break
+            count = len(rows)
+            rows = [(key, token) for key, token in rows if token]
+            if rows:
+                in_flight.append((rows[-1][0], count, pool.submit(rotate_chunk, rows)))
+            if len(in_flight) >= max_in_flight:
+                write_oldest()
+        while in_flight:
+            write_oldest()
+    finally:
+        reader.close()
+        writer.close()
+
+    state[table] = {"done": True, "failed": progress.failed}
+    save_checkpoint(checkpoint, state)
+    progress.finish()
+    return progress.failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-encrypt stored secrets with the newest key in FERNET_KEY.")
+    parser.add_argument("--chunk", type=int, default=1000, help="rows per read / write batch")
+    parser.add_argument("--workers", type=int, default=None, help="encryption processes (default: CPU count)")
+    parser.add_argument("--checkpoint", default="rotate.checkpoint", help="progress file used to resume")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+    try:
+        if rotate(args.chunk, args.workers, args.checkpoint, args.restart):
+            sys.exit(1)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; run again to resume from {args.checkpoint}.")
+        sys.exit(1)
@@ -0,0 +1,72 @@
+# db/router.py
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+
+# ===================================================
+# READ / WRITE ROUTING
+# ===================================================
+class ReplicaRouter:
+    """Chooses the connection pool for each read: a replica if possible, else the primary.
+
+    Writes always use `primary`. Reads go to the healthy replicas, picked round-robin
+    or by fewest connections in use (`strategy="least_loaded"`). A replica that fails
+    to hand out a connection, or drops one mid-query, is skipped for `retry_interval`
+    seconds. A user who wrote within the last `sticky_seconds` reads from the primary,
+    so they always see their own writes (e.g. the order they just placed) despite
+    replication lag.
+    """
+
+    STRATEGIES = ("round_robin", "least_loaded")
+
+    def __init__(self, primary, replicas=(), strategy="round_robin", sticky_seconds=5, retry_interval=30):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"❌ Unknown replica_strategy {strategy!r} (expected one of {self.STRATEGIES}).")
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.sticky_seconds = sticky_seconds
+        self.retry_interval = retry_interval
+        self._turn = itertools.count()
+        self._down_until = {}          # replica pool -> monotonic time it may be retried
+        self._writes = OrderedDict()   # username -> monotonic time of their last write, oldest first
+        self._lock = threading.Lock()
+
+    def candidates(self, username=None):
+        """Pools to try for a read, best first; the primary is always the last resort."""
+        if not self.replicas or (username is not None and self.is_sticky(username)):
+            return [self.primary]
+        now = time.monotonic()
+        with self._lock:
+            healthy = [p for p in self.replicas if self._down_until.get(p, 0) <= now]
+        if healthy:
+            start = next(self._turn) % len(healthy)
+            healthy = healthy[start:] + healthy[:start]
+            if self.strategy == "least_loaded":
+                healthy.sort(key=lambda pool: pool.in_use)  # stable: ties stay round-robin
+        return healthy + [self.primary]
+
+    def mark_down(self, pool):
+        with self._lock:
+            self._down_until[pool] = time.monotonic() + self.retry_interval
+
+    def note_write(self, username):
+        """Pin `username`'s reads to the primary for the next `sticky_seconds`."""
+        if not self.replicas or username is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._writes[username] = now
+            self._writes.move_to_end(username)
+            while self._writes:
+                oldest, at = next(iter(self._writes.items()))
+                if now - at < self.sticky_seconds:
+                    break
+                del self._writes[oldest]
+
+    def is_sticky(self, username):
+        with self._lock:
+            at = self._writes.get(username)
+        return at is not None and time.monotonic() - at < self.sticky_seconds
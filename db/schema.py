@@ -0,0 +1,71 @@
+# db/schema.py
+# Base tables of the `yippee` database. Later changes are numbered migrations in db/migrate.py.
+
+TABLES = [
+    """
+    CREATE TABLE userdata (
+        username VARCHAR(100) PRIMARY KEY,
+        password VARCHAR(255) NOT NULL,
+        name VARCHAR(100)
+    )
+    """,
+    """
+    CREATE TABLE restaurants (
+        name VARCHAR(100) PRIMARY KEY,
+        location VARCHAR(255),
+        phone VARCHAR(50),
+        website VARCHAR(255),
+        opening_hours VARCHAR(50),
+        cuisine VARCHAR(100),
+        rating DECIMAL(2,1)
+    )
+    """,
+    """
+    CREATE TABLE menu_items (
+        id {autoid},
+        restaurant VARCHAR(100) NOT NULL,
+        dish VARCHAR(100) NOT NULL,
+        price DECIMAL(10,2) NOT NULL,
+        available BOOLEAN NOT NULL DEFAULT TRUE,
+        CONSTRAINT uq_menu_dish UNIQUE (restaurant, dish),
+        FOREIGN KEY (restaurant) REFERENCES restaurants(name) ON DELETE CASCADE ON UPDATE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE payment (
+        id {autoid},
+        username VARCHAR(100),
+        card VARCHAR(255),
+        cvv VARCHAR(255),
+        expiry VARCHAR(255),
+        cardtype VARCHAR(255),
+        FOREIGN KEY (username) REFERENCES userdata(username) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE orders (
+        id {autoid},
+        username VARCHAR(100),
+        restaurant VARCHAR(100),
+        unix_time DOUBLE,
+        total_price DECIMAL(10,2),
+        FOREIGN KEY (username) REFERENCES userdata(username) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE order_items (
+        id {autoid},
+        order_id INT,
+        dish VARCHAR(100),
+        quantity INT,
+        price DECIMAL(10,2),
+        FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE
+    )
+    """,
+]
+
+
+def create_tables(backend, cursor):
+    """Create the base tables using the backend's column dialect."""
+    for ddl in TABLES:
+        cursor.execute(ddl.format(autoid=backend.autoid))
@@ -0,0 +1,292 @@
+# db/search.py
+import bisect
+import heapq
+import re
+import threading
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+
+Hit = namedtuple("Hit", ["dish", "restaurant", "price", "rating", "cuisine"])
+
+STOPWORDS = {"a", "an", "and", "the", "of", "with", "in", "for", "some", "me"}
+PRICE_WORDS = {
+    "under": "max", "below": "max", "less": "max", "cheaper": "max", "upto": "max", "<": "max",
+    "over": "min", "above": "min", "more": "min", ">": "min",
+}
+MIN_FUZZY_LENGTH = 4
+# a word found in the dish name counts for more than one found in the cuisine
+DISH_WEIGHT, CUISINE_WEIGHT = 2, 1
+# match quality per query word
+EXACT, PREFIX, TYPO = 3, 2, 1
+
+
+def tokenize(text):
+    """Lower-case word tokens, without stopwords."""
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOPWORDS]
+
+
+def _deletes(token):
+    """Every variant of `token` with one character removed."""
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+# ===================================================
+# DISH SEARCH INDEX
+# ===================================================
+class SearchIndex:
+    """In-memory inverted index over every restaurant's dishes and cuisine.
+
+    Query words match whole tokens first, then token prefixes ("biry" -> "biryani"), then
+    tokens one edit away ("biriyani" -> "biryani"). A trailing "under 400" / "above 200"
+    becomes a price filter. Results are ranked by match quality (dish names above cuisines),
+    then rating, then price. Each token's postings are also kept in rank order, so a
+    one-word query merges them lazily and stops after `limit` results instead of scoring
+    every match. Restaurants are indexed and removed one at a time, so menu changes never
+    need a full rebuild.
+    """
+
+    def __init__(self):
+        self._entries = {}        # entry id -> Hit
+        self._rank = {}           # entry id -> static tie-break key (rating desc, price, name)
+        self._by_restaurant = {}  # restaurant -> [entry ids]
+        self._postings = {}       # token -> {entry id: field weight}
+        self._ranked = {}         # token -> [(-weight, rank, entry id)] kept sorted, best first
+        self._vocab = []          # sorted tokens, for prefix lookups
+        self._variants = {}       # one-deletion variant -> set(tokens), for typo tolerance
+        self._next_id = 0
+        self._catalog = None
+        self._lock = threading.RLock()
+
+    # -----------------------
+    # Indexing
+    # -----------------------
+    def index_restaurant(self, name, menu, details):
+        """Add (or replace) all dishes of one restaurant."""
+        with self._lock:
+            self.remove_restaurant(name)
+            cuisine = details.get("Cuisine") or ""
+            rating = _decimal(details.get("Rating")) or Decimal(0)
+            cuisine_tokens = tokenize(cuisine)
+            ids = []
+            for dish, price in menu.items():
+                entry_id = self._next_id
+                self._next_id += 1
+                hit = Hit(dish, name, _decimal(price), rating, cuisine)
+                self._entries[entry_id] = hit
+                self._rank[entry_id] = (-hit.rating, hit.price, dish, name)
+                for token in cuisine_tokens:
+                    self._add_posting(token, entry_id, CUISINE_WEIGHT)
+                for token in tokenize(dish):
+                    self._add_posting(token, entry_id, DISH_WEIGHT)
+                ids.append(entry_id)
+            self._by_restaurant[name] = ids
+
+    def remove_restaurant(self, name):
+        """Drop every dish of a restaurant from the index."""
+        with self._lock:
+            for entry_id in self._by_restaurant.pop(name, []):
+                hit = self._entries[entry_id]
+                for token in set(tokenize(hit.dish) + tokenize(hit.cuisine)):
+                    self._remove_posting(token, entry_id)
+                del self._entries[entry_id]
+                del self._rank[entry_id]
+
+    def follow(self, catalog):
+        """Index everything in `catalog` now and apply its changes whenever it reloads."""
+        self._catalog = catalog
+        catalog.subscribe(self._on_catalog_change)
+        self._on_catalog_change(catalog.all(), [])
+        return self
+
+    def _on_catalog_change(self, changed, removed):
+        with self._lock:
+            for name in removed:
+                self.remove_restaurant(name)
+            for r in changed:
+                self.index_restaurant(r.name, r.menu, r.details)
+
+    # -----------------------
+    # Querying
+    # -----------------------
+    def search(self, query, limit=20):
+        """Return up to `limit` Hits for a free-text query such as "pizza under 400"."""
+        words, min_price, max_price = _parse_query(query)
+        if not words and min_price is None and max_price is None:
+            return []  # nothing to search for (empty, or only stopwords)
+        if self._catalog is not None:
+            self._catalog.all()  # reloads a stale or invalidated catalog, which re-indexes what changed
+        with self._lock:
+            if len(words) == 1:
+                return self._search_one(words[0], limit, min_price, max_price)
+
+            if not words:
+                # price-only query such as "under 100"
+                scores = dict.fromkeys(self._entries, 0)
+            else:
+                # intersect candidate ids with set operations first, then score only the survivors
+                per_word = [self._matching_tokens(word) for word in words]
+                candidates = None
+                for tokens in per_word:
+                    ids = set().union(*(self._postings[token].keys() for _, token in tokens))
+                    candidates = ids if candidates is None else candidates & ids
+                    if not candidates:
+                        return []
+                scores = {
+                    i: sum(
+                        max(quality * self._postings[token].get(i, 0) for quality, token in tokens)
+                        for tokens in per_word
+                    )
+                    for i in candidates
+                }
+
+            entries, rank = self._entries, self._rank
+            candidates = scores
+            if min_price is not None or max_price is not None:
+                candidates = [i for i in scores if _in_range(entries[i].price, min_price, max_price)]
+            best = heapq.nsmallest(limit, candidates, key=lambda i: (-scores[i], rank[i]))
+            return [entries[i] for i in best]
+
+    def _search_one(self, word, limit, min_price, max_price):
+        """Best-first merge of the rank-ordered postings of every token matching `word`."""
+        streams = [
+            ((quality * neg_weight, rank, i) for neg_weight, rank, i in self._ranked[token])
+            for quality, token in self._matching_tokens(word)
+        ]
+        hits, seen = [], set()
+        for _, _, entry_id in heapq.merge(*streams):
+            if entry_id in seen:
+                continue
+            seen.add(entry_id)
+            hit = self._entries[entry_id]
+            if _in_range(hit.price, min_price, max_price):
+                hits.append(hit)
+                if len(hits) == limit:
+                    break
+        return hits
+
+    def _matching_tokens(self, word):
+        """(quality, token) for indexed tokens equal to, starting with, or one typo away from `word`."""
+        tokens = []
+        if word in self._postings:
+            tokens.append((EXACT, word))
+        start = bisect.bisect_left(self._vocab, word)
+        for token in self._vocab[start:]:
+            if not token.startswith(word):
+                break
+            if token != word:
+                tokens.append((PREFIX, token))
+        if not tokens and len(word) >= MIN_FUZZY_LENGTH:
+            tokens = [(TYPO, token) for token in self._fuzzy_tokens(word)]
+        return tokens
+
+    def _fuzzy_tokens(self, word):
+        """Indexed tokens within one insertion, deletion, substitution or transposition of `word`."""
+        found = set(self._variants.get(word, ()))
+        for variant in _deletes(word):
+            if variant in self._postings:
+                found.add(variant)
+            found.update(self._variants.get(variant, ()))
+        return found
+
+    # -----------------------
+    # Internals
+    # -----------------------
+    def _add_posting(self, token, entry_id, weight):
+        postings = self._postings.get(token)
+        if postings is None:
+            postings = self._postings[token] = {}
+            self._ranked[token] = []
+            bisect.insort(self._vocab, token)
+            if len(token) >= MIN_FUZZY_LENGTH:
+                for variant in _deletes(token):
+                    self._variants.setdefault(variant, set()).add(token)
+        old = postings.get(entry_id)
+        if old is not None:
+            if old >= weight:
+                return
+            self._unrank(token, entry_id, old)
+        postings[entry_id] = weight
+        bisect.insort(self._ranked[token], (-weight, self._rank[entry_id], entry_id))
+
+    def _unrank(self, token, entry_id, weight):
+        ranked = self._ranked[token]
+        del ranked[bisect.bisect_left(ranked, (-weight, self._rank[entry_id], entry_id))]
+
+    def _remove_posting(self, token, entry_id):
+        postings = self._postings.get(token)
+        if postings is None:
+            return
+        weight = postings.pop(entry_id, None)
+        if weight is None:
+            return
+        self._unrank(token, entry_id, weight)
+        if not postings:
+            del self._postings[token]
+            del self._ranked[token]
+            del self._vocab[bisect.bisect_left(self._vocab, token)]
+            if len(token) >= MIN_FUZZY_LENGTH:
+                for variant in _deletes(token):
+                    tokens = self._variants.get(variant)
+                    if tokens is not None:
+                        tokens.discard(token)
+                        if not tokens:
+                            del self._variants[variant]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _in_range(price, min_price, max_price):
+    return (min_price is None or price >= min_price) and (max_price is None or price <= max_price)
+
+
+def _decimal(value):
+    if value is None:
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return None
+
+
+def _parse_query(query):
+    """Split a query into search words and optional (min, max) price bounds."""
+    raw = re.findall(r"[<>]|[a-z0-9]+(?:\.\d+)?", query.lower())
+    words, min_price, max_price = [], None, None
+    i = 0
+    while i < len(raw):
+        word = raw[i]
+        bound = PRICE_WORDS.get(word)
+        if bound:
+            # allow "less than 300", "under rs 300", "below ₹300"
+            j = i + 1
+            while j < len(raw) and raw[j] in ("than", "rs", "inr"):
+                j += 1
+            price = _decimal(raw[j]) if j < len(raw) and raw[j][0].isdigit() else None
+            if price is not None:
+                if bound == "max":
+                    max_price = price
+                else:
+                    min_price = price
+                i = j + 1
+                continue
+        if word not in STOPWORDS and word not in ("than", "rs", "inr"):
+            words.append(word)
+        i += 1
+    return words, min_price, max_price
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_index():
+    """Process-wide index that follows db.catalog, built on first use."""
+    global _shared
+    if _shared is None:
+        from db.catalog import catalog
+
+        with _shared_lock:
+            if _shared is None:
+                _shared = SearchIndex().follow(catalog)
+    return _shared
@@ -1,170 +1,682 @@
 # db/sql.py
-import mysql.connector as sql
-from cryptography.fernet import Fernet
-from dotenv import load_dotenv
-import os
 import json
+import os
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from decimal import Decimal
+
+from db.backends import load_config, from_config
+from db.metrics import metrics, instrumented
+from db.pool import ConnectionPool, PoolExhausted
+from db.router import ReplicaRouter
+from db.usercache import MISS, user_cache
+
+# Nothing below touches the disk, the network or the crypto library until the
+# first db call, so importing this module (and starting the CLI) stays fast.
+_lock = threading.Lock()
+_config = None
+_backend = None
+_pool = None
+_router = None
+_fernet = None
+
 
 # -----------------------
 # Load environment variables
 # -----------------------
-load_dotenv()
-key = os.getenv("FERNET_KEY")
-if not key:
-    raise ValueError("❌ Missing FERNET_KEY environment variable! Please add it to your .env file.")
-f = Fernet(key)
+def fernet_keys():
+    """The keys in FERNET_KEY: newest first, then any older keys still being rotated out."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    keys = [k.strip() for k in os.getenv("FERNET_KEY", "").split(",") if k.strip()]
+    if not keys:
+        raise ValueError("❌ Missing FERNET_KEY environment variable! Please add it to your .env file.")
+    return keys
+
+
+def fernet():
+    """The Fernet instance for FERNET_KEY, created on first use.
+
+    FERNET_KEY may list several comma-separated keys: data is encrypted with the
+    first and decrypted with whichever one matches (see db/rotate.py).
+    """
+    global _fernet
+    if _fernet is None:
+        from cryptography.fernet import Fernet, MultiFernet
+
+        with _lock:
+            if _fernet is None:
+                keys = fernet_keys()
+                _fernet = Fernet(keys[0]) if len(keys) == 1 else MultiFernet([Fernet(k) for k in keys])
+    return _fernet
+
 
 # -----------------------
-# Load SQL Credentials
+# Load SQL Credentials / Connection Pool
 # -----------------------
-with open("sqlDetails.json") as f_json:
-    config = json.load(f_json)
+def get_config():
+    """Settings from sqlDetails.json, read on first use."""
+    global _config
+    if _config is None:
+        with _lock:
+            if _config is None:
+                config = load_config()
+                metrics.configure(
+                    slow_query_ms=config.get("slow_query_ms", 100),
+                    slow_query_log=config.get("slow_query_log"),
+                )
+                user_cache.configure(
+                    maxsize=config.get("user_cache_size", 1024),
+                    ttl=config.get("user_cache_ttl", 300),
+                )
+                _config = config
+    return _config
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        config = get_config()
+        with _lock:
+            if _backend is None:
+                _backend = from_config(config)
+    return _backend
+
+
+def get_pool():
+    """The shared connection pool; connections themselves open lazily on checkout."""
+    global _pool
+    if _pool is None:
+        config = get_config()
+        backend = get_backend()
+        with _lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    backend,
+                    size=config.get("pool_size", 5),
+                    timeout=config.get("pool_timeout", 10),
+                    ping_interval=config.get("pool_ping_interval", 30),
+                )
+    return _pool
+
+
+def get_router():
+    """Read routing over the primary pool and one pool per entry in `replicas`.
+
+    Each replica entry overrides the connection settings of the primary, e.g.
+    {"host": "replica-1"} for MySQL or {"path": "replica.db"} for SQLite.
+    """
+    global _router
+    if _router is None:
+        config = get_config()
+        primary = get_pool()
+        with _lock:
+            if _router is None:
+                replicas = [
+                    ConnectionPool(
+                        from_config({**config, **replica}),
+                        size=replica.get("pool_size", config.get("pool_size", 5)),
+                        timeout=config.get("replica_timeout", 2),
+                        ping_interval=config.get("pool_ping_interval", 30),
+                    )
+                    for replica in config.get("replicas", [])
+                ]
+                _router = ReplicaRouter(
+                    primary,
+                    replicas,
+                    strategy=config.get("replica_strategy", "round_robin"),
+                    sticky_seconds=config.get("read_your_writes_seconds", 5),
+                    retry_interval=config.get("replica_retry_interval", 30),
+                )
+    return _router
+
+
+def __getattr__(name):
+    # keep `sql.pool`, `sql.backend`, `sql.config` and `sql.f` working for callers
+    lazy = {"pool": get_pool, "backend": get_backend, "config": get_config, "f": fernet}
+    if name in lazy:
+        return lazy[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@contextmanager
+def _cursor(user=None):
+    """Check out a primary connection and yield a cursor on it.
+
+    Pass the `user` a write is made for, so their next reads stay on the primary.
+    """
+    backend = get_backend()
+    with get_pool().connection() as conn:
+        cursor = backend.cursor(conn)
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+    if user is not None:
+        get_router().note_write(user)
+
+
+@contextmanager
+def _transaction(user=None):
+    """Like _cursor, but everything run on the cursor commits (or rolls back) as one unit."""
+    backend = get_backend()
+    with get_pool().connection() as conn:
+        backend.begin(conn)
+        cursor = backend.cursor(conn)
+        try:
+            yield cursor
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    if user is not None:
+        get_router().note_write(user)
 
-db = sql.connect(
-    host=config["host"],
-    user=config["username"],
-    password=config["password"],
-    database="yippee"
-)
-cursor = db.cursor(buffered=True)
-db.autocommit = True
+
+@contextmanager
+def _read_cursor(user=None):
+    """Yield a cursor for a read-only query, on a replica when one is healthy.
+
+    Reads for a `user` who just wrote something go to the primary. A replica that
+    cannot hand out a connection is marked down and the next candidate is tried.
+    """
+    router = get_router()
+    for pool in router.candidates(user):
+        try:
+            conn = pool.checkout()
+            break
+        except Exception as e:
+            if pool is router.primary:
+                raise
+            if not isinstance(e, PoolExhausted):
+                router.mark_down(pool)
+
+    backend = pool.backend
+    cursor = backend.cursor(conn)
+    broken = False
+    try:
+        yield cursor
+    except Exception as e:
+        broken = backend.is_connection_error(e)
+        if broken and pool is not router.primary:
+            router.mark_down(pool)
+        raise
+    finally:
+        cursor.close()
+        pool.checkin(conn, broken=broken)
 
 
 # ===================================================
 # USER MANAGEMENT
 # ===================================================
+def _user_row(username):
+    """The userdata row (username, password, name) or None, through the user cache."""
+    row = user_cache.get(username, "user")
+    if row is not MISS:
+        return row
+    generation = user_cache.generation
+    with _read_cursor(username) as cursor:
+        cursor.execute("SELECT * FROM userdata WHERE username=%s", (username,))
+        row = cursor.fetchone()
+    if row is not None:
+        # unknown users are not cached, so a registration elsewhere shows up at once
+        user_cache.put(username, "user", tuple(row), generation)
+    return row
+
+
+@instrumented
 def register(username, password, name):
     """Register a new user."""
-    encrypted_password = f.encrypt(password.encode()).decode()
-    cursor.execute("INSERT INTO userdata VALUES (%s, %s, %s)", (username, encrypted_password, name))
+    encrypted_password = fernet().encrypt(password.encode()).decode()
+    with _cursor(username) as cursor:
+        cursor.execute("INSERT INTO userdata VALUES (%s, %s, %s)", (username, encrypted_password, name))
+    user_cache.invalidate(username)
     return True
 
 
+@instrumented
 def login(username, password):
     """Authenticate user login."""
-    cursor.execute("SELECT password FROM userdata WHERE username=%s", (username,))
-    result = cursor.fetchone()
+    result = _user_row(username)
     if result:
-        decrypted = f.decrypt(result[0].encode()).decode()
+        decrypted = fernet().decrypt(result[1].encode()).decode()
         return decrypted == password
     return False
 
 
+@instrumented
 def check_user(username):
     """Check if a user exists and return their name."""
-    cursor.execute("SELECT * FROM userdata WHERE username=%s", (username,))
-    result = cursor.fetchone()
+    result = _user_row(username)
     if result:
         return True, result[2]
     return False, None
 
 
+@instrumented
 def change_password(username, new_password):
     """Update user password."""
-    encrypted_password = f.encrypt(new_password.encode()).decode()
-    cursor.execute("UPDATE userdata SET password=%s WHERE username=%s", (encrypted_password, username))
+    encrypted_password = fernet().encrypt(new_password.encode()).decode()
+    with _cursor(username) as cursor:
+        cursor.execute("UPDATE userdata SET password=%s WHERE username=%s", (encrypted_password, username))
+    user_cache.invalidate(username)
     return True
 
 
 # ===================================================
 # RESTAURANTS
 # ===================================================
-def get_restaurants():
-    """Fetch all restaurants."""
-    cursor.execute("SELECT * FROM restaurants")
-    return cursor.fetchall()
+@instrumented
+def get_restaurants(primary=False):
+    """Fetch all restaurants (name, location, phone, website, opening_hours, cuisine, rating).
+
+    Pass `primary=True` to skip the replicas and read the latest committed data.
+    """
+    with (_cursor() if primary else _read_cursor()) as cursor:
+        cursor.execute(
+            "SELECT name, location, phone, website, opening_hours, cuisine, rating FROM restaurants ORDER BY name"
+        )
+        return cursor.fetchall()
+
+
+@instrumented
+def get_restaurants_page(after_name=None, limit=20):
+    """Fetch up to `limit` restaurants ordered by name, starting after `after_name` (keyset paging)."""
+    conditions, params = "", []
+    if after_name is not None:
+        conditions = " WHERE name > %s"
+        params.append(after_name)
+    params.append(limit)
+    with _read_cursor() as cursor:
+        cursor.execute(
+            "SELECT name, location, phone, website, opening_hours, cuisine, rating FROM restaurants"
+            f"{conditions} ORDER BY name LIMIT %s",
+            params
+        )
+        return cursor.fetchall()
+
+
+@instrumented
+def get_menu(restaurant):
+    """Fetch the available dishes of one restaurant as (dish, price) rows."""
+    with _read_cursor() as cursor:
+        cursor.execute(
+            "SELECT dish, price FROM menu_items WHERE restaurant=%s AND available ORDER BY id",
+            (restaurant,)
+        )
+        return cursor.fetchall()
+
+
+@instrumented
+def get_menu_items(primary=False):
+    """Fetch every available dish as (restaurant, dish, price) rows (see get_restaurants for `primary`)."""
+    with (_cursor() if primary else _read_cursor()) as cursor:
+        cursor.execute("SELECT restaurant, dish, price FROM menu_items WHERE available ORDER BY restaurant, id")
+        return cursor.fetchall()
+
+
+@instrumented
+def set_dish_available(restaurant, dish, available):
+    """Mark a single dish as available or sold out."""
+    with _cursor() as cursor:
+        cursor.execute(
+            "UPDATE menu_items SET available=%s WHERE restaurant=%s AND dish=%s",
+            (available, restaurant, dish)
+        )
+        changed = cursor.rowcount > 0
+    _menu_changed()
+    return changed
+
+
+@instrumented
+def set_dish_price(restaurant, dish, price):
+    """Update the price of a single dish."""
+    with _cursor() as cursor:
+        cursor.execute(
+            "UPDATE menu_items SET price=%s WHERE restaurant=%s AND dish=%s",
+            (price, restaurant, dish)
+        )
+        changed = cursor.rowcount > 0
+    _menu_changed()
+    return changed
+
+
+def _menu_changed():
+    """Reload this process's catalog on next use; db.pricing and db.search re-index from that reload."""
+    from db.catalog import catalog
+
+    catalog.invalidate()
 
 
 # ===================================================
 # PAYMENT
 # ===================================================
+@instrumented
 def add_payment(username, card, cvv, expiry, cardtype):
-    """Encrypt and store payment details securely."""
-    enc_card = f.encrypt(card.encode()).decode()
-    enc_cvv = f.encrypt(cvv.encode()).decode()
-    enc_expiry = f.encrypt(expiry.encode()).decode()
-    enc_type = f.encrypt(cardtype.encode()).decode()
-
-    cursor.execute("""
-        INSERT INTO payment (username, card, cvv, expiry, cardtype)
-        VALUES (%s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE card=%s, cvv=%s, expiry=%s, cardtype=%s
-    """, (
-        username, enc_card, enc_cvv, enc_expiry, enc_type,
-        enc_card, enc_cvv, enc_expiry, enc_type
-    ))
+    """Encrypt and store payment details securely.
+
+    The card is stored as one encrypted JSON record; only the card type and last four
+    digits are kept in plain text (`display`) for showing the saved card.
+    """
+    record = json.dumps({"card": card, "cvv": cvv, "expiry": expiry, "cardtype": cardtype})
+    payload = fernet().encrypt(record.encode()).decode()
+
+    with _cursor(username) as cursor:
+        cursor.execute(
+            get_backend().upsert("payment", ["username", "payload", "display"], ["username"]),
+            (username, payload, f"{cardtype} {card[-4:]}")
+        )
+    user_cache.invalidate(username)
     return True
 
 
+@instrumented
 def retrieve_payment(username):
     """Decrypt and return saved payment details."""
-    cursor.execute("SELECT card, cvv, expiry, cardtype FROM payment WHERE username=%s", (username,))
-    result = cursor.fetchone()
+    with _read_cursor(username) as cursor:
+        cursor.execute("SELECT payload FROM payment WHERE username=%s", (username,))
+        result = cursor.fetchone()
     if result:
         try:
-            return True, {
-                "card": f.decrypt(result[0].encode()).decode(),
-                "cvv": f.decrypt(result[1].encode()).decode(),
-                "expiry": f.decrypt(result[2].encode()).decode(),
-                "cardtype": f.decrypt(result[3].encode()).decode(),
-            }
+            return True, json.loads(fernet().decrypt(result[0].encode()))
         except Exception:
             return False, None
     return False, None
 
 
+@instrumented
+def payment_summary(username):
+    """The saved card as {"cardtype", "last4"} (None if there is none), through the user cache.
+
+    This is all the UI shows, so checkout and account screens never decrypt anything;
+    it comes from the plain `display` column.
+    """
+    summary = user_cache.get(username, "payment")
+    if summary is not MISS:
+        return summary
+    generation = user_cache.generation
+    with _read_cursor(username) as cursor:
+        cursor.execute("SELECT display FROM payment WHERE username=%s", (username,))
+        result = cursor.fetchone()
+    summary = None
+    if result and result[0]:
+        cardtype, last4 = result[0].rsplit(" ", 1)
+        summary = {"cardtype": cardtype, "last4": last4}
+    user_cache.put(username, "payment", summary, generation)
+    return summary
+
+
 # ===================================================
 # ORDERS
 # ===================================================
-def place_order(username, restaurant, items, unix, total_price):
-    """Insert order and associated order items."""
-    cursor.execute(
-        "INSERT INTO orders (username, restaurant, unix_time, total_price) VALUES (%s, %s, %s, %s)",
-        (username, restaurant, unix, total_price)
-    )
-    order_id = cursor.lastrowid
-
-    for dish, qty, price in items:
+@instrumented
+def place_order(username, restaurant, items, unix):
+    """Price a cart of (dish, quantity) lines and insert it as one order, in a single transaction.
+
+    Line and order totals come from db.pricing, never from the caller; unknown dishes
+    or bad quantities raise PricingError before anything is written.
+    """
+    from db.eta import note_order
+    from db.pricing import price_cart
+
+    cart = price_cart(restaurant, items)
+    with _transaction(username) as cursor:
         cursor.execute(
+            "INSERT INTO orders (username, restaurant, unix_time, total_price) VALUES (%s, %s, %s, %s)",
+            (username, cart.restaurant, unix, cart.total)
+        )
+        order_id = cursor.lastrowid
+        cursor.executemany(
             "INSERT INTO order_items (order_id, dish, quantity, price) VALUES (%s, %s, %s, %s)",
-            (order_id, dish, qty, price)
+            [(order_id, line.dish, line.quantity, line.price) for line in cart.lines]
         )
+        _record_stats(cursor, [
+            (username, cart.restaurant, cart.total, [(line.dish, line.quantity, line.price) for line in cart.lines])
+        ])
+    note_order(cart.restaurant, unix)
 
     return True, order_id
 
 
-def view_orders(username):
-    """Return all orders for a given user."""
-    cursor.execute("SELECT * FROM orders WHERE username=%s ORDER BY id DESC", (username,))
-    orders = cursor.fetchall()
+@instrumented
+def place_orders(orders):
+    """Insert a batch of queued orders and all their items in one transaction.
+
+    `orders` is a list of (order_ref, username, restaurant, items, unix, total_price),
+    priced by db.pricing when they were queued. Orders whose ref is already stored
+    (a replayed spool) are skipped. Returns {order_ref: order_id} for the whole batch.
+    """
+    refs = [order[0] for order in orders]
+    marks = ", ".join(["%s"] * len(refs))
+    with _transaction() as cursor:
+        cursor.execute(f"SELECT order_ref FROM orders WHERE order_ref IN ({marks})", refs)
+        stored = {row[0] for row in cursor.fetchall()}
+        new = [order for order in orders if order[0] not in stored]
+
+        # MySQL turns an INSERT executemany into one multi-row INSERT
+        cursor.executemany(
+            "INSERT INTO orders (order_ref, username, restaurant, unix_time, total_price) VALUES (%s, %s, %s, %s, %s)",
+            [(ref, username, restaurant, unix, total_price)
+             for ref, username, restaurant, items, unix, total_price in new]
+        )
+        cursor.execute(f"SELECT order_ref, id FROM orders WHERE order_ref IN ({marks})", refs)
+        ids = dict(cursor.fetchall())
+        cursor.executemany(
+            "INSERT INTO order_items (order_id, dish, quantity, price) VALUES (%s, %s, %s, %s)",
+            [(ids[ref], dish, qty, price)
+             for ref, username, restaurant, items, unix, total_price in new
+             for dish, qty, price in items]
+        )
+        _record_stats(cursor, [
+            (username, restaurant, total_price, items)
+            for ref, username, restaurant, items, unix, total_price in new
+        ])
+    from db.eta import note_order
+
+    router = get_router()
+    for ref, username, restaurant, items, unix, total_price in new:
+        router.note_write(username)
+        note_order(restaurant, unix)
+    return ids
+
+
+def _record_stats(cursor, orders):
+    """Add (username, restaurant, total_price, [(dish, qty, price)]) orders to the db/stats.py tables.
+
+    Runs inside the caller's order transaction. Orders are summed per row first and
+    rows are written in key order, so concurrent transactions lock them in the same order.
+    """
+    # (key columns) -> [count, amount]
+    users = defaultdict(lambda: [0, Decimal(0)])
+    restaurants = defaultdict(lambda: [0, Decimal(0)])
+    dishes = defaultdict(lambda: [0, Decimal(0)])
+    for username, restaurant, total_price, items in orders:
+        total_price = Decimal(str(total_price))  # replayed spool orders carry prices as text
+        for stats in (users[(username,)], restaurants[(restaurant,)]):
+            stats[0] += 1
+            stats[1] += total_price
+        for dish, qty, price in items:
+            line = dishes[(restaurant, dish)]
+            line[0] += int(qty)
+            line[1] += Decimal(str(price))
+    if not users:
+        return
+
+    backend = get_backend()
+    for table, columns, keys, rows in [
+        ("user_stats", ["username", "order_count", "total_spent"], ["username"], users),
+        ("restaurant_stats", ["restaurant", "order_count", "revenue"], ["restaurant"], restaurants),
+        ("dish_stats", ["restaurant", "dish", "quantity", "revenue"], ["restaurant", "dish"], dishes),
+    ]:
+        if rows:
+            cursor.executemany(
+                backend.upsert(table, columns, keys, add=columns[len(keys):]),
+                [(*key, *values) for key, values in sorted(rows.items())]
+            )
+
+
+@instrumented
+def active_orders(now):
+    """(restaurant, unix_time) of every order still due after `now`, for db/eta.py.
+
+    A range scan of idx_orders_due; archived orders are all long delivered.
+    """
+    with _read_cursor() as cursor:
+        cursor.execute("SELECT restaurant, unix_time FROM orders WHERE unix_time > %s", (now,))
+        return cursor.fetchall()
+
 
-    if not orders:
+@instrumented
+def view_orders(username, before_order_id=None, limit=None):
+    """Return orders for a given user, newest first.
+
+    Orders and their items are fetched with a single join. Pass `limit` (and the
+    last seen `before_order_id`) to page through long histories by keyset. Recent
+    orders come from `orders`; the archive tables (see db/archive.py), which only
+    hold older ids, are read only when a page reaches past the hot ones.
+    """
+    with _read_cursor(username) as cursor:
+        data = _order_page(cursor, "orders", "order_items", username, before_order_id, limit)
+        if limit is None or len(data) < limit:
+            if data:
+                before_order_id = data[-1]["order_id"]
+            remaining = None if limit is None else limit - len(data)
+            data += _order_page(cursor, "orders_archive", "order_items_archive", username, before_order_id, remaining)
+
+    if not data:
         return False, None
+    return True, data
+
+
+def _order_page(cursor, orders_table, items_table, username, before_order_id, limit):
+    conditions = "username=%s"
+    params = [username]
+    if before_order_id is not None:
+        conditions += " AND id < %s"
+        params.append(before_order_id)
+    page = ""
+    if limit is not None:
+        page = " LIMIT %s"
+        params.append(limit)
+
+    cursor.execute(f"""
+        SELECT o.id, o.restaurant, o.unix_time, o.total_price, i.dish, i.quantity, i.price
+        FROM (
+            SELECT id, restaurant, unix_time, total_price FROM {orders_table}
+            WHERE {conditions} ORDER BY id DESC{page}
+        ) o
+        LEFT JOIN {items_table} i ON i.order_id = o.id
+        ORDER BY o.id DESC, i.id
+    """, params)
 
     data = []
-    for order in orders:
-        order_id, _, restaurant, unix_time, total_price = order
-        cursor.execute("SELECT dish, quantity, price FROM order_items WHERE order_id=%s", (order_id,))
-        items = cursor.fetchall()
-        data.append({
-            "order_id": order_id,
-            "restaurant": restaurant,
-            "items": items,
-            "unix_time": unix_time,
-            "total_price": total_price
-        })
-    return True, data
+    for order_id, restaurant, unix_time, total_price, dish, qty, price in cursor.fetchall():
+        if not data or data[-1]["order_id"] != order_id:
+            data.append({
+                "order_id": order_id,
+                "restaurant": restaurant,
+                "items": [],
+                "unix_time": unix_time,
+                "total_price": total_price
+            })
+        if dish is not None:
+            data[-1]["items"].append((dish, qty, price))
+    return data
+
+
+@instrumented
+def archive_orders(cutoff, batch_size=1000):
+    """Move up to `batch_size` orders delivered before `cutoff` (unix time) to the archive tables.
+
+    Only orders older than every order still due after `cutoff` are moved, oldest
+    first, so archived ids always stay below the ids left in `orders`. The newest
+    order always stays, so the auto-increment counter can never fall back onto
+    archived ids. Returns the number of orders moved; 0 means nothing is left to archive.
+    """
+    with _transaction() as cursor:
+        cursor.execute(
+            "SELECT COALESCE((SELECT MIN(id) FROM orders WHERE unix_time >= %s), (SELECT MAX(id) FROM orders))",
+            (cutoff,)
+        )
+        boundary = cursor.fetchone()[0]
+        if boundary is None:
+            return 0
+        cursor.execute(
+            "SELECT id FROM orders WHERE unix_time < %s AND id < %s ORDER BY id LIMIT %s",
+            (cutoff, boundary, batch_size)
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            return 0
+
+        marks = ", ".join(["%s"] * len(ids))
+        cursor.execute(f"""
+            INSERT INTO orders_archive (id, username, restaurant, unix_time, total_price, order_ref)
+            SELECT id, username, restaurant, unix_time, total_price, order_ref FROM orders WHERE id IN ({marks})
+        """, ids)
+        cursor.execute(f"""
+            INSERT INTO order_items_archive (id, order_id, dish, quantity, price)
+            SELECT id, order_id, dish, quantity, price FROM order_items WHERE order_id IN ({marks})
+        """, ids)
+        cursor.execute(f"DELETE FROM order_items WHERE order_id IN ({marks})", ids)
+        cursor.execute(f"DELETE FROM orders WHERE id IN ({marks})", ids)
+    return len(ids)
+
+
+# ===================================================
+# STATISTICS
+# ===================================================
+@instrumented
+def user_stats(username):
+    """The user's {"order_count", "total_spent"} from the summary tables (db/stats.py)."""
+    with _read_cursor(username) as cursor:
+        cursor.execute("SELECT order_count, total_spent FROM user_stats WHERE username=%s", (username,))
+        row = cursor.fetchone()
+    order_count, total_spent = row or (0, 0)
+    return {"order_count": order_count, "total_spent": total_spent}
+
+
+@instrumented
+def top_restaurants(limit=5):
+    """The most ordered-from restaurants as (restaurant, order_count, revenue) rows."""
+    with _read_cursor() as cursor:
+        cursor.execute(
+            "SELECT restaurant, order_count, revenue FROM restaurant_stats ORDER BY order_count DESC LIMIT %s",
+            (limit,)
+        )
+        return cursor.fetchall()
+
+
+@instrumented
+def top_dishes(restaurant=None, limit=5):
+    """The best-selling dishes, overall or of one restaurant, as (restaurant, dish, quantity, revenue) rows."""
+    conditions, params = "", []
+    if restaurant is not None:
+        conditions = " WHERE restaurant=%s"
+        params.append(restaurant)
+    params.append(limit)
+    with _read_cursor() as cursor:
+        cursor.execute(
+            f"SELECT restaurant, dish, quantity, revenue FROM dish_stats{conditions} ORDER BY quantity DESC LIMIT %s",
+            params
+        )
+        return cursor.fetchall()
 
 
 # ===================================================
 # USER DATA RETRIEVAL
 # ===================================================
+@instrumented
 def retrieve_user(username):
     """Fetch user details (name, email)."""
-    cursor.execute("SELECT * FROM userdata WHERE username=%s", (username,))
-    return cursor.fetchone()
+    return _user_row(username)
 
 
+@instrumented
 def logout():
     """Placeholder (session handling handled in main app)."""
     return True
@@ -0,0 +1,83 @@
+# db/stats.py
+# Order statistics kept in summary tables (migration 6):
+#     user_stats        username -> order_count, total_spent
+#     restaurant_stats  restaurant -> order_count, revenue
+#     dish_stats        (restaurant, dish) -> quantity, revenue
+# place_order / place_orders update them in the same transaction as the order itself
+# (see sql._record_stats). Recompute them from every order, hot and archived, with:
+#     python -m db.stats --rebuild
+import argparse
+import time
+
+from db.backends import load_config, from_config
+
+# every order ever placed: orders still in the hot tables plus archived ones (db/archive.py)
+ALL_ORDERS = """(
+    SELECT id, username, restaurant, total_price FROM orders
+    UNION ALL
+    SELECT id, username, restaurant, total_price FROM orders_archive
+)"""
+ALL_ITEMS = """(
+    SELECT o.restaurant, i.dish, i.quantity, i.price FROM orders o JOIN order_items i ON i.order_id = o.id
+    UNION ALL
+    SELECT o.restaurant, i.dish, i.quantity, i.price
+    FROM orders_archive o JOIN order_items_archive i ON i.order_id = o.id
+)"""
+
+REBUILD = [
+    ("user_stats", f"""
+        INSERT INTO user_stats (username, order_count, total_spent)
+        SELECT username, COUNT(*), COALESCE(SUM(total_price), 0) FROM {ALL_ORDERS} o
+        WHERE username IS NOT NULL GROUP BY username
+    """),
+    ("restaurant_stats", f"""
+        INSERT INTO restaurant_stats (restaurant, order_count, revenue)
+        SELECT restaurant, COUNT(*), COALESCE(SUM(total_price), 0) FROM {ALL_ORDERS} o
+        WHERE restaurant IS NOT NULL GROUP BY restaurant
+    """),
+    ("dish_stats", f"""
+        INSERT INTO dish_stats (restaurant, dish, quantity, revenue)
+        SELECT restaurant, dish, COALESCE(SUM(quantity), 0), COALESCE(SUM(price), 0) FROM {ALL_ITEMS} i
+        WHERE restaurant IS NOT NULL AND dish IS NOT NULL GROUP BY restaurant, dish
+    """),
+]
+
+
+def rebuild(backend, conn):
+    """Recompute every summary table from the order history in one transaction.
+
+    Returns {table: rows written}.
+    """
+    cursor = backend.cursor(conn)
+    counts = {}
+    backend.begin(conn)
+    try:
+        for table, statement in REBUILD:
+            cursor.execute(f"DELETE FROM {table}")
+            cursor.execute(statement)
+            counts[table] = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the order statistics summary tables.")
+    parser.add_argument("--rebuild", action="store_true", help="recompute every table from all orders")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.error("nothing to do (use --rebuild)")
+
+    backend = from_config(load_config())
+    conn = backend.connect()
+    try:
+        start = time.monotonic()
+        counts = rebuild(backend, conn)
+    finally:
+        conn.close()
+    summary = ", ".join(f"{table}: {count} rows" for table, count in counts.items())
+    print(f"✅ Rebuilt order statistics in {time.monotonic() - start:.1f}s ({summary}).")
@@ -0,0 +1,82 @@
+# db/usercache.py
+import threading
+import time
+from collections import OrderedDict
+
+# returned by UserCache.get when nothing (fresh) is cached
+MISS = object()
+
+
+# ===================================================
+# USER / SESSION CACHE
+# ===================================================
+class UserCache:
+    """Per-process LRU of what db.sql knows about recently seen users.
+
+    Each username maps to a few named fields (the `userdata` row, the saved-card
+    summary), each kept for `ttl` seconds. At most `maxsize` users are held; the
+    least recently used one is dropped first. db.sql invalidates a user whenever it
+    writes their row or card, so only changes made by other processes can be up to
+    `ttl` seconds stale.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._users = OrderedDict()  # username -> {field: (value, expires_at)}
+        self._lock = threading.Lock()
+        # bumped on every invalidation; a put for data read before the bump is dropped
+        self.generation = 0
+
+    def configure(self, maxsize=None, ttl=None):
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if ttl is not None:
+                self.ttl = ttl
+            self._trim()
+
+    def get(self, username, field):
+        """The cached value, or MISS if there is none or it expired."""
+        now = time.monotonic()
+        with self._lock:
+            fields = self._users.get(username)
+            if fields is None:
+                return MISS
+            value, expires_at = fields.get(field, (MISS, 0))
+            if expires_at <= now:
+                fields.pop(field, None)
+                return MISS
+            self._users.move_to_end(username)
+            return value
+
+    def put(self, username, field, value, generation=None):
+        """Cache `value`; pass the `generation` seen before reading it from the database
+        so that a concurrent write's invalidation is never overwritten with stale data."""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            fields = self._users.setdefault(username, {})
+            fields[field] = (value, time.monotonic() + self.ttl)
+            self._users.move_to_end(username)
+            self._trim()
+
+    def invalidate(self, username):
+        with self._lock:
+            self.generation += 1
+            self._users.pop(username, None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._users.clear()
+
+    def _trim(self):
+        while len(self._users) > self.maxsize:
+            self._users.popitem(last=False)
+
+    def __len__(self):
+        return len(self._users)
+
+
+user_cache = UserCache()
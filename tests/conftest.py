@@ -0,0 +1,61 @@
+# tests/conftest.py
+# Every test runs against a fresh SQLite database built the way db/setup.py builds one.
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import catalog as catalog_module, pricing, search, sql  # noqa: E402
+from db.backends import from_config  # noqa: E402
+from db.importer import SEED_MENU, SEED_RESTAURANTS, import_catalog  # noqa: E402
+from db.migrate import migrate  # noqa: E402
+from db.schema import create_tables  # noqa: E402
+from db.usercache import user_cache  # noqa: E402
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """sqlDetails.json for a new, seeded SQLite database in a temporary directory."""
+    from cryptography.fernet import Fernet
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("FERNET_KEY", Fernet.generate_key().decode())
+    config = {"backend": "sqlite", "path": str(tmp_path / "yippee.db"), "pool_size": 5, "pool_timeout": 10}
+    with open("sqlDetails.json", "w") as f:
+        json.dump(config, f)
+
+    backend = from_config(config)
+    conn = backend.connect()
+    create_tables(backend, backend.cursor(conn))
+    migrate(backend, conn)
+    import_catalog(backend, conn, SEED_RESTAURANTS, SEED_MENU, quiet=True)
+    conn.close()
+    return config
+
+
+@pytest.fixture
+def db(config, monkeypatch):
+    """db.sql pointed at the test database, with every process-wide cache starting empty."""
+    for name in ("_config", "_backend", "_pool", "_router", "_fernet"):
+        monkeypatch.setattr(sql, name, None)
+    catalog = catalog_module.catalog
+    monkeypatch.setattr(catalog, "_restaurants", [])
+    monkeypatch.setattr(catalog, "_by_name", {})
+    monkeypatch.setattr(catalog, "_loaded_at", None)
+    monkeypatch.setattr(catalog, "_listeners", [])
+    monkeypatch.setattr(pricing, "_shared", None)
+    monkeypatch.setattr(search, "_shared", None)
+    user_cache.clear()
+    yield sql
+    if sql._pool is not None:
+        sql._pool.close()
+
+
+@pytest.fixture
+def user(db):
+    """A registered customer's username."""
+    db.register("tester@example.com", "secret", "Tester")
+    return "tester@example.com"
@@ -0,0 +1,43 @@
+# tests/test_backends.py
+import threading
+import time
+import uuid
+
+
+def test_sqlite_writers_wait_for_each_other(db, user):
+    """Checkouts, the queue's batch writer and the archiver share one SQLite file without lock errors."""
+    errors = []
+    done = {"place_order": 0, "place_orders": 0, "archive_orders": 0}
+    deadline = time.monotonic() + 1.5
+
+    def run(name, call):
+        while time.monotonic() < deadline:
+            try:
+                call()
+                done[name] += 1
+            except Exception as e:
+                errors.append(e)
+                return
+
+    def place_order():
+        db.place_order(user, "P60", [("Italian Pizza", 1)], time.time() - 7200)
+
+    def place_orders():
+        db.place_orders([
+            [str(uuid.uuid4()), user, "P60", [["Italian Pizza", 1, "400.00"]], time.time() + 600, "400.00"]
+            for _ in range(5)
+        ])
+
+    def archive_orders():
+        db.archive_orders(time.time() - 3600, 50)
+
+    threads = [threading.Thread(target=run, args=("place_order", place_order)) for _ in range(4)]
+    threads.append(threading.Thread(target=run, args=("place_orders", place_orders)))
+    threads.append(threading.Thread(target=run, args=("archive_orders", archive_orders)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert all(done.values())
@@ -0,0 +1,32 @@
+# tests/test_importer.py
+from db.backends import from_config
+from db.importer import import_restaurants
+
+
+def test_invalid_rows_are_rejected_not_fatal(config, tmp_path):
+    path = tmp_path / "restaurants.csv"
+    path.write_text(
+        "name,location,rating\n"
+        "Good Place,Kochi,4.5\n"
+        "Not A Number,Kochi,nan\n"
+        "Infinite,Kochi,inf\n"
+        "Too High,Kochi,7\n"
+        ",Kochi,3\n"
+    )
+    backend = from_config(config)
+    conn = backend.connect()
+    stats = import_restaurants(backend, conn, str(path), quiet=True)
+    conn.close()
+    assert (stats.rows, stats.invalid) == (1, 4)
+    assert [line for line, _ in stats.errors] == [3, 4, 5, 6]
+
+
+def test_json_lines_that_are_not_objects_are_rejected(config, tmp_path):
+    path = tmp_path / "restaurants.jsonl"
+    path.write_text('{"name": "Good Place", "rating": 4}\n[1, 2]\n"x"\n3\nnull\n{broken\n{"name": "Also Good"}\n')
+    backend = from_config(config)
+    conn = backend.connect()
+    stats = import_restaurants(backend, conn, str(path), chunk_size=2, quiet=True)
+    conn.close()
+    assert (stats.rows, stats.invalid) == (2, 5)
+    assert {reason for _, reason in stats.errors} == {"not a JSON object"}
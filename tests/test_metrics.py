@@ -0,0 +1,23 @@
+# tests/test_metrics.py
+import logging
+
+from db.metrics import Metrics, slow_log
+
+
+def test_slow_queries_stay_off_stderr_by_default():
+    # with no handler at all, logging's last-resort handler would print every warning to stderr
+    assert any(isinstance(h, logging.NullHandler) for h in slow_log.handlers)
+    metrics = Metrics()
+    metrics.configure(slow_query_ms=0)
+    metrics.record_statement("SELECT 1", 5.0)
+    assert metrics.statements["SELECT 1"].count == 1
+
+
+def test_slow_queries_go_to_the_configured_log(tmp_path):
+    path = tmp_path / "slow.log"
+    metrics = Metrics()
+    metrics.configure(slow_query_ms=10, slow_query_log=str(path))
+    metrics.record_statement("SELECT 2", 5.0)
+    metrics.record_statement("SELECT 3", 50.0)
+    assert "slow query (50.0 ms): SELECT 3" in path.read_text()
+    assert "SELECT 2" not in path.read_text()
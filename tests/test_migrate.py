@@ -0,0 +1,37 @@
+# tests/test_migrate.py
+import pytest
+from cryptography.fernet import Fernet
+
+from db import sql
+from db.backends import from_config
+from db.migrate import current_version, migrate
+from db.schema import create_tables
+
+
+def test_payment_migration_keeps_cards_it_cannot_decrypt(tmp_path, monkeypatch):
+    right, wrong = Fernet.generate_key(), Fernet.generate_key()
+    monkeypatch.setattr(sql, "_fernet", None)
+    monkeypatch.setenv("FERNET_KEY", wrong.decode())
+
+    backend = from_config({"backend": "sqlite", "path": str(tmp_path / "yippee.db")})
+    conn = backend.connect()
+    cursor = backend.cursor(conn)
+    create_tables(backend, cursor)
+    migrate(backend, conn, target=3)
+    cursor.execute("INSERT INTO userdata VALUES (%s, %s, %s)", ("a@example.com", "x", "A"))
+    tokens = [Fernet(right).encrypt(v.encode()).decode() for v in ("4111111111111111", "123", "12/30", "Visa")]
+    cursor.execute("INSERT INTO payment (username, card, cvv, expiry, cardtype) VALUES (%s, %s, %s, %s, %s)",
+                   ["a@example.com", *tokens])
+
+    with pytest.raises(ValueError, match="do not decrypt"):
+        migrate(backend, conn)
+    assert current_version(backend, conn) == 3
+    assert {"card", "cvv", "expiry", "cardtype"} <= backend.columns(cursor, "payment")
+
+    monkeypatch.setattr(sql, "_fernet", None)
+    monkeypatch.setenv("FERNET_KEY", right.decode())
+    migrate(backend, conn)
+    assert "card" not in backend.columns(cursor, "payment")
+    cursor.execute("SELECT display FROM payment")
+    assert cursor.fetchone()[0] == "Visa 1111"
+    conn.close()
@@ -0,0 +1,75 @@
+# tests/test_orderqueue.py
+import json
+import time
+
+import pytest
+
+from db.orderqueue import OrderQueue, Spool
+
+CART = [("Italian Pizza", 2)]
+
+
+def _order_count(db):
+    with db._cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM orders")
+        return cursor.fetchone()[0]
+
+
+def test_orders_are_written_in_batches(db, user, tmp_path):
+    q = OrderQueue(str(tmp_path / "orders.spool"))
+    futures = [q.submit(user, "p60", CART, time.time() + 600) for _ in range(10)]
+    assert q.flush(5)
+    ids = [f.result(1) for f in futures]
+    assert len(set(ids)) == 10 and None not in ids
+    q.close()
+    _, orders = db.view_orders(user)
+    assert {o["restaurant"] for o in orders} == {"P60"}
+    assert all(o["total_price"] == 800 for o in orders)
+
+
+def test_spool_replays_unfinished_orders_once(db, user, tmp_path):
+    path = str(tmp_path / "orders.spool")
+    written = ["ref-0", user, "P60", [["Italian Pizza", 1, "400.00"]], time.time() + 600, "400.00"]
+    lost = ["ref-1", user, "P60", [["Italian Pizza", 1, "400.00"]], time.time() + 600, "400.00"]
+    # a crash after the first order committed but before its "done" line reached the spool
+    db.place_orders([tuple(written)])
+    with open(path, "w") as f:
+        f.write(json.dumps({"order": written}) + "\n")
+        f.write(json.dumps({"order": lost}) + "\n")
+        f.write('{"order": ["torn')
+
+    q = OrderQueue(path)
+    assert q.flush(5)
+    q.close()
+    with db._cursor() as cursor:
+        cursor.execute("SELECT order_ref FROM orders ORDER BY id")
+        assert [row[0] for row in cursor.fetchall()] == ["ref-0", "ref-1"]
+    assert Spool(path).pending() == []
+
+
+def test_refused_order_fails_alone(db, user, tmp_path, caplog, capsys):
+    path = str(tmp_path / "orders.spool")
+    q = OrderQueue(path, retry_delay=0.01, linger=0.2)
+    bad = q.submit("nobody@example.com", "P60", CART, time.time() + 600)
+    good = q.submit(user, "P60", CART, time.time() + 600)
+    assert q.flush(5)
+    with pytest.raises(Exception, match="FOREIGN KEY"):
+        bad.result(1)
+    assert good.result(1) is not None
+    assert Spool(path).pending() == []  # nothing left to block the next start
+    q.close()
+    assert _order_count(db) == 1
+    assert "Dropping queued order" in caplog.text
+    assert capsys.readouterr().out == ""  # nothing printed over the CLI
+
+
+def test_spool_is_compacted(db, user, tmp_path):
+    path = str(tmp_path / "orders.spool")
+    q = OrderQueue(path, compact_after=20)
+    for _ in range(50):
+        q.submit(user, "P60", CART, time.time() + 600)
+    assert q.flush(5)
+    with open(path) as f:
+        assert len(f.readlines()) < 20
+    q.close()
+    assert _order_count(db) == 50
@@ -0,0 +1,58 @@
+# tests/test_orders.py
+import time
+from decimal import Decimal
+
+
+def _place(db, user, count, unix):
+    return [db.place_order(user, "P60", [("Italian Pizza", 1)], unix)[1] for _ in range(count)]
+
+
+def _pages(db, user, limit):
+    pages, before = [], None
+    while True:
+        _, orders = db.view_orders(user, before, limit)
+        if not orders:
+            return pages
+        pages.append([o["order_id"] for o in orders])
+        before = orders[-1]["order_id"]
+
+
+def test_history_pages_across_hot_and_archived_orders(db, user):
+    now = time.time()
+    old = _place(db, user, 7, now - 3 * 86400)
+    new = _place(db, user, 5, now + 1800)
+    assert db.archive_orders(now - 86400, batch_size=3) == 3
+    while db.archive_orders(now - 86400, batch_size=3):
+        pass
+
+    with db._cursor() as cursor:
+        cursor.execute("SELECT id FROM orders_archive ORDER BY id")
+        assert [row[0] for row in cursor.fetchall()] == old
+        cursor.execute("SELECT id FROM orders ORDER BY id")
+        assert [row[0] for row in cursor.fetchall()] == new
+
+    expected = sorted(old + new, reverse=True)
+    assert _pages(db, user, 5) == [expected[:5], expected[5:10], expected[10:]]
+    assert _pages(db, user, 4) == [expected[:4], expected[4:8], expected[8:]]
+    _, everything = db.view_orders(user)
+    assert [o["order_id"] for o in everything] == expected
+    assert all(o["items"] == [("Italian Pizza", 1, 400)] for o in everything)
+
+
+def test_restaurant_pages_follow_name_order(db):
+    names = [row[0] for row in db.get_restaurants()]
+    pages, after = [], None
+    while True:
+        page = db.get_restaurants_page(after, 4)
+        if not page:
+            break
+        pages.extend(row[0] for row in page)
+        after = page[-1][0]
+    assert pages == names
+
+
+def test_stats_follow_orders(db, user):
+    _place(db, user, 3, time.time() + 600)
+    assert db.user_stats(user) == {"order_count": 3, "total_spent": Decimal("1200")}
+    assert db.top_restaurants(1)[0][:2] == ("P60", 3)
+    assert db.top_dishes("P60", 1)[0][1:3] == ("Italian Pizza", 3)
@@ -0,0 +1,76 @@
+# tests/test_pool.py
+import threading
+import time
+
+import pytest
+
+from db.backends import SQLiteBackend
+from db.pool import ConnectionPool, PoolExhausted
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(SQLiteBackend({"path": str(tmp_path / "pool.db")}), size=1, timeout=5)
+    yield pool
+    pool.close()
+
+
+def _wait_for_waiters(pool, count):
+    deadline = time.monotonic() + 5
+    while len(pool._waiters) < count:
+        assert time.monotonic() < deadline, "waiters never queued up"
+        time.sleep(0.005)
+
+
+def test_returned_connection_goes_to_the_longest_waiter(pool):
+    held = pool.checkout()
+    served = []
+
+    def wait_in_line(name):
+        conn = pool.checkout()
+        served.append(name)
+        pool.checkin(conn)
+
+    threads = []
+    for i in range(5):
+        t = threading.Thread(target=wait_in_line, args=(i,))
+        t.start()
+        threads.append(t)
+        _wait_for_waiters(pool, i + 1)  # arrive strictly one after another
+
+    pool.checkin(held)
+    for t in threads:
+        t.join(5)
+    assert served == [0, 1, 2, 3, 4]
+
+
+def test_checkout_never_jumps_the_queue(pool):
+    held = pool.checkout()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.checkout()))
+    waiter.start()
+    _wait_for_waiters(pool, 1)
+
+    pool.checkin(held)
+    waiter.join(5)
+    assert got == [held]  # handed straight to the waiter, not parked where a newcomer could take it
+    assert pool.in_use == 1
+    pool.checkin(got[0])
+
+
+def test_broken_connection_frees_its_slot(pool):
+    conn = pool.checkout()
+    pool.checkin(conn, broken=True)
+    fresh = pool.checkout()
+    assert fresh is not conn
+    fresh.execute("SELECT 1")
+    pool.checkin(fresh)
+
+
+def test_exhausted_pool_times_out(pool):
+    pool.timeout = 0.05
+    held = pool.checkout()
+    with pytest.raises(PoolExhausted):
+        pool.checkout()
+    assert not pool._waiters
+    pool.checkin(held)
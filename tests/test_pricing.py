@@ -0,0 +1,55 @@
+# tests/test_pricing.py
+import json
+import shutil
+from decimal import Decimal
+
+import pytest
+
+from db.pricing import PricingError, price_cart
+
+
+def test_lines_are_merged_and_priced_exactly(db):
+    cart = price_cart("p60", [("Italian Pizza", 1), ("italian pizza ", "2")])
+    assert cart.restaurant == "P60"
+    assert [tuple(line) for line in cart.lines] == [("Italian Pizza", 3, Decimal("400.00"), Decimal("1200.00"))]
+    assert cart.total == Decimal("1200.00")
+
+
+def test_every_problem_is_reported(db):
+    with pytest.raises(PricingError) as e:
+        price_cart("P60", [("Nope", 1), ("Italian Pizza", 0), ("Italian Pizza", "x")])
+    message = str(e.value)
+    assert "'Nope' is not on the menu" in message
+    assert "invalid quantity 0 for Italian Pizza" in message
+    assert "invalid quantity 'x' for Italian Pizza" in message
+
+
+@pytest.mark.parametrize("restaurant, items, error", [
+    ("Nowhere", [("Italian Pizza", 1)], "Unknown restaurant"),
+    ("P60", [], "Cart is empty"),
+    ("P60", [("Italian Pizza", 60), ("Italian Pizza", 40)], "At most 99"),
+])
+def test_invalid_carts(db, restaurant, items, error):
+    with pytest.raises(PricingError, match=error):
+        price_cart(restaurant, items)
+
+
+def test_menu_changes_apply_at_once(db, user):
+    assert price_cart("P60", [("Italian Pizza", 1)]).total == Decimal("400.00")
+    db.set_dish_price("P60", "Italian Pizza", 999)
+    assert price_cart("P60", [("Italian Pizza", 1)]).total == Decimal("999.00")
+    db.set_dish_available("P60", "Italian Pizza", False)
+    with pytest.raises(PricingError, match="not on the menu"):
+        db.place_order(user, "P60", [("Italian Pizza", 1)], 0)
+
+
+def test_menu_changes_ignore_lagging_replicas(db, config, monkeypatch):
+    # a replica that never caught up: a copy of the database taken before the change
+    shutil.copy(config["path"], "replica.db")
+    with open("sqlDetails.json", "w") as f:
+        json.dump({**config, "replicas": [{"path": "replica.db"}]}, f)
+    monkeypatch.setattr(db, "_config", None)
+
+    assert price_cart("P60", [("Italian Pizza", 1)]).total == Decimal("400.00")
+    db.set_dish_price("P60", "Italian Pizza", 999)
+    assert price_cart("P60", [("Italian Pizza", 1)]).total == Decimal("999.00")
@@ -0,0 +1,48 @@
+# tests/test_rotate.py
+import os
+
+from cryptography.fernet import Fernet
+
+from db.rotate import rotate
+
+
+def _passwords(db):
+    with db._cursor() as cursor:
+        cursor.execute("SELECT username, password FROM userdata ORDER BY username")
+        return dict(cursor.fetchall())
+
+
+def _rotate_to_new_key(db, monkeypatch, old):
+    new = Fernet.generate_key().decode()
+    monkeypatch.setenv("FERNET_KEY", f"{new},{old}")
+    monkeypatch.setattr(db, "_fernet", None)
+    return new
+
+
+def test_rotation_re_encrypts_with_the_new_key(db, monkeypatch, capsys):
+    old = os.environ["FERNET_KEY"]
+    db.register("a@example.com", "pw-a", "A")
+    db.register("b@example.com", "pw-b", "B")
+    new = _rotate_to_new_key(db, monkeypatch, old)
+
+    assert rotate(workers=1) == 0
+    out = capsys.readouterr().out
+    assert "userdata: 2 rows re-encrypted" in out
+    assert "older keys can be removed" in out
+    assert Fernet(new.encode()).decrypt(_passwords(db)["a@example.com"].encode()) == b"pw-a"
+
+
+def test_undecryptable_rows_are_not_counted_and_keep_the_old_keys(db, monkeypatch, capsys):
+    old = os.environ["FERNET_KEY"]
+    db.register("a@example.com", "pw-a", "A")
+    stranger = Fernet(Fernet.generate_key()).encrypt(b"pw-b").decode()
+    with db._cursor() as cursor:
+        cursor.execute("INSERT INTO userdata VALUES (%s, %s, %s)", ("b@example.com", stranger, "B"))
+    _rotate_to_new_key(db, monkeypatch, old)
+
+    assert rotate(workers=1) == 1
+    out = capsys.readouterr().out
+    assert "userdata: 1 rows re-encrypted" in out
+    assert "older keys can be removed" not in out
+    assert "Do not remove the older keys" in out
+    assert _passwords(db)["b@example.com"] == stranger
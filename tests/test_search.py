@@ -0,0 +1,58 @@
+# tests/test_search.py
+import pytest
+
+from db.search import SearchIndex
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.index_restaurant("Spice Route", {"Chicken Biryani": 250, "Veg Biryani": 180, "Lime Soda": 60},
+                           {"Cuisine": "Biryani, North Indian", "Rating": "4.1"})
+    index.index_restaurant("Paragon", {"Mutton Biryani": 320, "Fish Curry": 280},
+                           {"Cuisine": "Kerala", "Rating": "4.7"})
+    index.index_restaurant("Pizza Hub", {"Margherita Pizza": 300, "Farmhouse Pizza": 450},
+                           {"Cuisine": "Italian", "Rating": "3.9"})
+    return index
+
+
+def _dishes(hits):
+    return [hit.dish for hit in hits]
+
+
+def test_dish_matches_rank_above_cuisine_then_by_rating(index):
+    assert _dishes(index.search("biryani")) == ["Mutton Biryani", "Veg Biryani", "Chicken Biryani", "Lime Soda"]
+
+
+def test_prefix_and_typo_matches(index):
+    assert _dishes(index.search("biry"))[:3] == ["Mutton Biryani", "Veg Biryani", "Chicken Biryani"]
+    assert _dishes(index.search("biriyani"))[0] == "Mutton Biryani"
+    assert _dishes(index.search("margherita piza")) == ["Margherita Pizza"]
+
+
+def test_price_filters(index):
+    assert _dishes(index.search("pizza under 400")) == ["Margherita Pizza"]
+    assert _dishes(index.search("biryani above 200")) == ["Mutton Biryani", "Chicken Biryani"]
+    assert _dishes(index.search("less than 100")) == ["Lime Soda"]
+
+
+@pytest.mark.parametrize("query", ["", "   ", "the and of", "with some"])
+def test_nothing_to_search_for(index, query):
+    assert index.search(query) == []
+
+
+def test_removed_restaurants_disappear(index):
+    index.remove_restaurant("Paragon")
+    assert "Mutton Biryani" not in _dishes(index.search("biryani"))
+    assert index.search("curry") == []
+
+
+def test_shared_index_follows_menu_changes(db):
+    from db.search import get_index
+
+    assert "Italian Pizza" in _dishes(get_index().search("italian pizza"))
+    db.set_dish_price("P60", "Italian Pizza", 999)
+    hit = next(h for h in get_index().search("italian pizza") if h.dish == "Italian Pizza")
+    assert hit.price == 999
+    db.set_dish_available("P60", "Italian Pizza", False)
+    assert "Italian Pizza" not in _dishes(get_index().search("italian pizza"))
@@ -0,0 +1,47 @@
+# tests/test_server.py
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from app.server import Handler
+
+
+@pytest.fixture
+def conn(db):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    yield conn
+    conn.close()
+    server.shutdown()
+    server.server_close()
+
+
+def _call(conn, method, path, body=None):
+    data = body if isinstance(body, bytes) else (json.dumps(body).encode() if body is not None else None)
+    conn.request(method, path, body=data, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_bad_input_is_a_client_error(conn):
+    assert _call(conn, "GET", "/search?q=pizza&limit=abc")[0] == 400
+    assert _call(conn, "GET", "/restaurants?limit=x")[0] == 400
+    assert _call(conn, "POST", "/login", [1]) == (400, {"error": "Request body must be a JSON object."})
+    assert _call(conn, "POST", "/login", b"{not json")[0] == 400
+    assert _call(conn, "GET", "/search?q=pizza&limit=2")[0] == 200
+
+
+def test_unknown_route_does_not_desync_the_connection(conn):
+    assert _call(conn, "POST", "/nowhere", {"padding": "x" * 1000})[0] == 404
+    status, restaurants = _call(conn, "GET", "/restaurants?limit=1")
+    assert status == 200 and len(restaurants) == 1
+
+
+def test_user_lookup_reveals_no_names(conn, user):
+    assert _call(conn, "GET", f"/users?email={user}") == (200, {"exists": True})
+    assert _call(conn, "GET", "/users?email=nobody@example.com") == (200, {"exists": False})